@@ -1,6 +1,5 @@
 import streamlit as st
-import time
-from engine import processor, summarizer
+from engine import jobs, summarizer, viewer
 import re
 
 # --- PAGE CONFIGURATION ---
@@ -79,65 +78,65 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# --- SIDEBAR CONTROLS ---
-with st.sidebar:
-    st.markdown('<div class="sidebar-title">Upload The Document </div>', unsafe_allow_html=True)
-    st.markdown('<div class="sidebar-sub">Here</div>', unsafe_allow_html=True)
-    uploaded_file = st.file_uploader("Upload legal document for synthesis", type="pdf", label_visibility="collapsed")
+SECTION_LABELS = {
+    "exec_summary": "Executive Summary",
+    "background": "Detailed Case Background",
+    "issues": "Issues for Determination",
+    "observations": "Court Observations",
+    "decision": "Final Decision",
+}
 
-# --- MAIN PAGE LOGIC ---
-if not uploaded_file:
-    # LANDING PAGE UI
-    st.markdown(f"""
-        <div class="hero-container">
-            <h1 class="hero-title">Legal Document Summarizer and Analysis System</h1>
-            <p class="hero-subtitle">Automated synthesis of judicial records and legal instruments with verbatim source traceability. Upload a document in the sidebar to begin structured analysis.</p>
-            <div class="feature-grid">
-                <div class="feature-card">
-                    <div class="feature-label">Extraction</div>
-                    <div class="feature-text">Deterministic detection of Court, Case ID, and Jurisdiction markers.</div>
-                </div>
-                <div class="feature-card">
-                    <div class="feature-label">Synthesis</div>
-                    <div class="feature-text">Abstractive consolidation of factual history and judicial observations.</div>
-                </div>
-                <div class="feature-card">
-                    <div class="feature-label">Traceability</div>
-                    <div class="feature-text">Verification enabled via direct cross-referencing with original source documentation.</div>
-                </div>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+# --- DOCUMENT VIEWER ---
+def jump_to_offset(raw_start, raw_end=None):
+    st.session_state.viewer_span = (raw_start, raw_end) if raw_end else None
+    st.session_state.viewer_first_line = viewer.window_around(st.session_state.line_index, raw_start)
 
-else:
-    # DATA PROCESSING & SESSION PERSISTENCE
-    if "final_data" not in st.session_state:
-        status_box = st.empty()
-        with status_box.container():
-            st.markdown('<div class="status-container">', unsafe_allow_html=True)
-            st.write("### Structured Analysis in Progress")
-            steps = [
-                "Verifying document integrity...",
-                "Mapping jurisdictional markers...",
-                "Identifying Petitioner vs Respondent...",
-                "Synthesizing factual background...",
-                "Finalizing verbatim traceability log..."
-            ]
-            prog = st.progress(0)
-            for i, s in enumerate(steps):
-                st.markdown(f'<div class="status-step">> {s}</div>', unsafe_allow_html=True)
-                time.sleep(0.6)
-                prog.progress((i + 1) / len(steps))
-            
-            raw_text = processor.get_text(uploaded_file)
-            st.session_state.full_text = raw_text
-            st.session_state.final_data = summarizer.get_summarized_data(raw_text)
-            status_box.empty()
-
-    data = st.session_state.final_data
-    full_text = st.session_state.full_text
-
-    # RESULTS DISPLAY
+def jump_to_trace(clean_offset, length):
+    offset_map = st.session_state.final_data["offset_map"]
+    jump_to_offset(
+        summarizer.to_raw_offset(offset_map, clean_offset),
+        summarizer.to_raw_offset(offset_map, clean_offset + length)
+    )
+
+def page_viewer(step):
+    st.session_state.viewer_first_line = viewer.clamp_first_line(
+        st.session_state.line_index, st.session_state.viewer_first_line + step
+    )
+
+def run_search():
+    keyword = st.session_state.search_keyword
+    st.session_state.search_matches = viewer.find_matches(st.session_state.full_text, keyword)
+    st.session_state.search_position = 0
+    if st.session_state.search_matches:
+        first_match = st.session_state.search_matches[0]
+        jump_to_offset(first_match, first_match + len(keyword))
+
+def step_search(step):
+    matches = st.session_state.search_matches
+    st.session_state.search_position = (st.session_state.search_position + step) % len(matches)
+    match_start = matches[st.session_state.search_position]
+    jump_to_offset(match_start, match_start + len(st.session_state.search_keyword))
+
+def render_document_window(key_prefix, keyword=None):
+    # Only the current window of lines is rendered, whatever the document size
+    line_index = st.session_state.line_index
+    first_line = st.session_state.viewer_first_line
+    window_text, window_start = viewer.get_window(st.session_state.full_text, line_index, first_line)
+    highlighted = viewer.highlight_window(window_text, window_start, keyword, st.session_state.viewer_span)
+    
+    last_line = min(first_line + viewer.WINDOW_LINES, len(line_index))
+    st.caption(f"Lines {first_line + 1}–{last_line} of {len(line_index)}")
+    st.markdown(f'<div style="background:white; color:black; padding:30px; line-height:1.8; white-space: pre-wrap; border-radius:10px;">{highlighted}</div>', unsafe_allow_html=True)
+    
+    prev_col, next_col = st.columns(2)
+    prev_col.button("◀ Previous lines", key=f"{key_prefix}_prev", on_click=page_viewer, args=(-viewer.WINDOW_LINES,), disabled=first_line == 0)
+    next_col.button("Next lines ▶", key=f"{key_prefix}_next", on_click=page_viewer, args=(viewer.WINDOW_LINES,), disabled=last_line >= len(line_index))
+
+# --- RESULTS DISPLAY ---
+def render_results(data):
+    if data.get("degraded"):
+        st.warning(f"Partial analysis: {', '.join(data['timeouts'])} exceeded the time budget.")
+    
     t1, t2, t3, t4 = st.tabs(["CASE BRIEF", "FACTS & ISSUES", "SOURCE SUMMARY", "SEARCH"])
 
     with t1:
@@ -160,9 +159,13 @@ else:
         st.markdown("### Source Traceability Log")
         st.markdown('<p style="color:#94a3b8;">Direct quotes from the original judgment and supporting the analysis.</p>', unsafe_allow_html=True)
         
+        if st.session_state.viewer_span:
+            st.markdown('<div style="color:white; font-weight:bold; margin: 20px 0 10px 0;">Source View</div>', unsafe_allow_html=True)
+            render_document_window("trace")
+        
         for section, sentences in data["source_log"].items():
             st.markdown(f'<div style="color:white; font-weight:bold; margin: 20px 0 10px 0; border-bottom: 1px solid #333; padding-bottom:5px;">{section}</div>', unsafe_allow_html=True)
-            for sent in sentences:
+            for i, sent in enumerate(sentences):
                 if "]" in sent:
                     ref, content = sent.split("]", 1)
                     ref = ref + "]"
@@ -175,12 +178,149 @@ else:
                         <div class="source-text">"{content.strip()}"</div>
                     </div>
                 """, unsafe_allow_html=True)
+                
+                ref_offset = re.search(r"\d+", ref)
+                if ref_offset:
+                    st.button(
+                        "View in source",
+                        key=f"trace_{section}_{i}",
+                        on_click=jump_to_trace,
+                        args=(int(ref_offset.group()), len(content.strip()))
+                    )
 
     with t4:
         st.markdown("### Search Repository")
-        keyword = st.text_input("Enter term to locate in original text:")
+        keyword = st.text_input("Enter term to locate in original text:", key="search_keyword", on_change=run_search)
         if keyword:
-            highlighted = re.sub(f"({re.escape(keyword)})", r'<span class="highlight">\1</span>', full_text, flags=re.I)
-            st.markdown(f'<div style="background:white; color:black; padding:30px; line-height:1.8; white-space: pre-wrap; border-radius:10px;">{highlighted}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div style="background:white; color:black; padding:30px; white-space: pre-wrap; border-radius:10px;">{full_text}</div>', unsafe_allow_html=True)
\ No newline at end of file
+            matches = st.session_state.search_matches
+            if matches:
+                match_col, prev_col, next_col = st.columns([2, 1, 1])
+                match_col.caption(f"Match {st.session_state.search_position + 1} of {len(matches)}")
+                prev_col.button("Previous match", on_click=step_search, args=(-1,))
+                next_col.button("Next match", on_click=step_search, args=(1,))
+            else:
+                st.caption("No matches found.")
+        render_document_window("search", keyword)
+
+# --- DOCUMENT WORKSPACE ---
+STATUS_LABELS = {
+    "queued": "Queued",
+    "extracting": "Extracting text",
+    "summarizing": "Summarizing",
+    "done": "Ready",
+    "failed": "Failed",
+}
+
+def select_document(job):
+    # Point the result view, viewer and search at the chosen document
+    st.session_state.viewer_doc = job.job_id
+    st.session_state.final_data = job.result
+    st.session_state.full_text = job.full_text
+    st.session_state.line_index = job.line_index
+    st.session_state.viewer_first_line = 0
+    st.session_state.viewer_span = None
+    st.session_state.search_matches = []
+    st.session_state.search_position = 0
+    st.session_state.search_keyword = ""
+
+def render_workspace(job_queue):
+    job_list = job_queue.jobs()
+    
+    for job in job_list:
+        st.markdown(f'<div class="status-step">> {job.name} — {STATUS_LABELS[job.status]} ({job.elapsed:.0f}s)</div>', unsafe_allow_html=True)
+    
+    selected_id = st.radio(
+        "Document",
+        [job.job_id for job in job_list],
+        format_func=lambda job_id: job_queue.get(job_id).name,
+        horizontal=True,
+        key="selected_document"
+    )
+    job = job_queue.get(selected_id)
+    
+    if job.status == "done":
+        if st.session_state.get("viewer_doc") != job.job_id:
+            select_document(job)
+        render_results(job.result)
+    elif job.status == "failed":
+        st.error(f"Analysis failed: {job.error}")
+    else:
+        # Summaries stream into the cards while the document is processed
+        st.write("### Structured Analysis in Progress")
+        for key, label in SECTION_LABELS.items():
+            st.markdown(f'<div class="data-card"><div class="card-label">{label}</div>{job.partial.get(key, "…")}</div>', unsafe_allow_html=True)
+
+@st.fragment(run_every=0.5)
+def render_live_workspace(job_queue):
+    render_workspace(job_queue)
+    if not job_queue.pending:
+        # Everything finished: one full rerun switches back to the static view
+        st.rerun()
+
+# --- SIDEBAR CONTROLS ---
+with st.sidebar:
+    st.markdown('<div class="sidebar-title">Upload The Document </div>', unsafe_allow_html=True)
+    st.markdown('<div class="sidebar-sub">Here</div>', unsafe_allow_html=True)
+    uploaded_files = st.file_uploader("Upload legal document for synthesis", type="pdf", accept_multiple_files=True, label_visibility="collapsed")
+    decoding_profile = st.selectbox(
+        "Decoding profile",
+        list(summarizer.DECODING_PROFILES),
+        index=list(summarizer.DECODING_PROFILES).index(summarizer.DEFAULT_PROFILE),
+        help="fast and greedy stream word by word; beam-search profiles fill each card when its section is done."
+    )
+    stream_exec_summary = st.checkbox(
+        "Stream executive summary",
+        value=True,
+        help="Decode the executive summary greedily, at full length, so it appears word by word within seconds whatever the profile above."
+    )
+    st.caption(f"Up to {jobs.MAX_CONCURRENT_ANALYSES} documents are analyzed at a time.")
+
+# --- MAIN PAGE LOGIC ---
+if not uploaded_files:
+    # LANDING PAGE UI
+    st.markdown(f"""
+        <div class="hero-container">
+            <h1 class="hero-title">Legal Document Summarizer and Analysis System</h1>
+            <p class="hero-subtitle">Automated synthesis of judicial records and legal instruments with verbatim source traceability. Upload a document in the sidebar to begin structured analysis.</p>
+            <div class="feature-grid">
+                <div class="feature-card">
+                    <div class="feature-label">Extraction</div>
+                    <div class="feature-text">Deterministic detection of Court, Case ID, and Jurisdiction markers.</div>
+                </div>
+                <div class="feature-card">
+                    <div class="feature-label">Synthesis</div>
+                    <div class="feature-text">Abstractive consolidation of factual history and judicial observations.</div>
+                </div>
+                <div class="feature-card">
+                    <div class="feature-label">Traceability</div>
+                    <div class="feature-text">Verification enabled via direct cross-referencing with original source documentation.</div>
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+else:
+    # BACKGROUND PROCESSING & SESSION PERSISTENCE
+    if "job_queue" not in st.session_state:
+        st.session_state.job_queue = jobs.JobQueue()
+    job_queue = st.session_state.job_queue
+    
+    upload_ids = set()
+    for uploaded in uploaded_files:
+        # One job per upload and option set: changing the options re-analyzes
+        job_id = f"{uploaded.file_id}:{decoding_profile}:{stream_exec_summary}"
+        upload_ids.add(job_id)
+        job_queue.submit(
+            job_id, uploaded.name, uploaded.getvalue(),
+            profile=decoding_profile,
+            section_profiles={"exec_summary": "greedy"} if stream_exec_summary else None
+        )
+    
+    for job in job_queue.jobs():
+        if job.job_id not in upload_ids:
+            job_queue.discard(job.job_id)
+    
+    if job_queue.pending:
+        render_live_workspace(job_queue)
+    else:
+        render_workspace(job_queue)
@@ -0,0 +1,75 @@
+import argparse
+import time
+
+from engine import processor, summarizer, workers
+
+
+def parse_split(value):
+    """
+    Parses a "PROCESSESxTHREADS" split such as "4x8".
+    """
+    processes, threads = value.lower().split("x")
+    return int(processes), int(threads)
+
+
+def splits_for_cores(core_count):
+    """
+    Every processes x threads split that uses exactly core_count cores.
+    """
+    return [
+        (core_count // threads, threads)
+        for threads in range(1, core_count + 1)
+        if core_count % threads == 0
+    ]
+
+
+def benchmark_split(documents, num_workers, threads_per_worker, rounds=1):
+    """
+    Documents per minute for one split, excluding model load time.
+    """
+    pool = workers.ShardedSummarizer(num_workers, threads_per_worker, summarizer.MODEL_NAME)
+    try:
+        pool.warm_up()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            pool.summarize_documents(documents)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+
+    return len(documents) * rounds * 60 / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Documents per minute for each process x thread split.")
+    parser.add_argument("pdfs", nargs="+", help="Judgments to summarize")
+    parser.add_argument("--splits", nargs="*", type=parse_split, help="Splits such as 1x32 4x8 32x1")
+    parser.add_argument("--cores", nargs="*", type=int, help="Core counts to scale over, e.g. 4 8 16 32 (default: all cores)")
+    parser.add_argument("--profile", default=summarizer.DEFAULT_PROFILE, choices=sorted(summarizer.DECODING_PROFILES), help="Decoding profile")
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the documents per split")
+    args = parser.parse_args()
+
+    documents = []
+    for pdf_path in args.pdfs:
+        with open(pdf_path, "rb") as pdf_file:
+            cleaned_text = summarizer.clean_legal_text(processor.get_text(pdf_file))
+        documents.append(summarizer.build_section_requests(
+            cleaned_text,
+            summarizer.get_section_spans(cleaned_text),
+            summarizer.resolve_section_profiles(args.profile)
+        ))
+
+    print(f"{'processes':>10} {'threads':>8} {'cores':>6} {'docs/min':>10}")
+    results = []
+    splits = args.splits
+    if not splits:
+        core_counts = args.cores or [len(workers.available_cores())]
+        splits = [split for core_count in core_counts for split in splits_for_cores(core_count)]
+
+    for num_workers, threads_per_worker in splits:
+        throughput = benchmark_split(documents, num_workers, threads_per_worker, args.rounds)
+        results.append((throughput, num_workers, threads_per_worker))
+        print(f"{num_workers:>10} {threads_per_worker:>8} {num_workers * threads_per_worker:>6} {throughput:>10.1f}")
+
+    best_throughput, best_workers, best_threads = max(results)
+    print(f"\nBest split: SUMMARIZER_WORKERS={best_workers} SUMMARIZER_THREADS_PER_WORKER={best_threads} ({best_throughput:.1f} docs/min)")
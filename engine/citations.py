@@ -0,0 +1,183 @@
+import sqlite3
+import sys
+import threading
+
+from engine import legal_text, processor
+
+
+# 1. CITATION GRAPH
+
+class CitationGraph:
+    """
+    Cross-judgment citation graph stored in SQLite.
+    Citation keys are interned to integer node IDs; edges are kept in a
+    clustered (citing, cited) table for "cites" plus a covering
+    (cited, citing) index for "cited by", so both directions are a
+    single index range scan. A judgment's own case number and
+    neutral/reporter citations are stored as its aliases, so citations
+    in any of those styles reach the judgment.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS nodes (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS edges (
+                citing INTEGER NOT NULL,
+                cited INTEGER NOT NULL,
+                PRIMARY KEY (citing, cited)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS edges_reverse ON edges (cited, citing);
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias INTEGER NOT NULL,
+                judgment INTEGER NOT NULL,
+                PRIMARY KEY (alias, judgment)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS aliases_reverse ON aliases (judgment, alias);
+        """)
+
+    def _node_ids(self, keys):
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO nodes (key) VALUES (?)", [(key,) for key in keys]
+        )
+        return [
+            self._connection.execute("SELECT id FROM nodes WHERE key = ?", (key,)).fetchone()[0]
+            for key in keys
+        ]
+
+    def add_judgment(self, judgment_key, cited_keys, alias_keys=()):
+        """
+        Records the citations and aliases of one judgment. Re-adding a
+        judgment replaces both, so re-indexing is safe.
+        """
+        alias_keys = sorted(set(alias_keys) - {judgment_key})
+        cited_keys = sorted(set(cited_keys) - {judgment_key} - set(alias_keys))
+
+        with self._lock, self._connection:
+            judgment_id, *other_ids = self._node_ids([judgment_key] + alias_keys + cited_keys)
+            alias_ids, cited_ids = other_ids[:len(alias_keys)], other_ids[len(alias_keys):]
+
+            self._connection.execute("DELETE FROM edges WHERE citing = ?", (judgment_id,))
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO edges (citing, cited) VALUES (?, ?)",
+                [(judgment_id, cited_id) for cited_id in cited_ids]
+            )
+            self._connection.execute("DELETE FROM aliases WHERE judgment = ?", (judgment_id,))
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO aliases (alias, judgment) VALUES (?, ?)",
+                [(alias_id, judgment_id) for alias_id in alias_ids]
+            )
+
+    # Judgments a key names: the key itself plus any judgment it is an
+    # alias of; and every name of those judgments
+    _RESOLVE = """
+        WITH target AS (SELECT id FROM nodes WHERE key = ?),
+        judgments AS (
+            SELECT id FROM target
+            UNION SELECT judgment FROM aliases WHERE alias IN (SELECT id FROM target)
+        ),
+        names AS (
+            SELECT id FROM judgments
+            UNION SELECT alias FROM aliases WHERE judgment IN (SELECT id FROM judgments)
+        )
+    """
+
+    def _neighbours(self, query, key):
+        with self._lock:
+            return [row[0] for row in self._connection.execute(self._RESOLVE + query, (key,))]
+
+    def cites(self, key):
+        """
+        Keys cited by the judgment named by key (its key or any alias).
+        """
+        return self._neighbours("""
+            SELECT DISTINCT cited_node.key FROM edges
+            JOIN nodes AS cited_node ON cited_node.id = edges.cited
+            WHERE edges.citing IN (SELECT id FROM judgments)
+        """, key)
+
+    def cited_by(self, key):
+        """
+        Judgments that cite the key, or any name of the judgment it names.
+        """
+        return self._neighbours("""
+            SELECT DISTINCT citing_node.key FROM edges
+            JOIN nodes AS citing_node ON citing_node.id = edges.citing
+            WHERE edges.cited IN (SELECT id FROM names)
+        """, key)
+
+    def close(self):
+        self._connection.close()
+
+
+# 2. INDEXING
+
+def judgment_key(analysis_result, doc_id):
+    """
+    Graph key of an analyzed judgment. Case numbers repeat across courts,
+    so a judgment is keyed by its court plus a specific case number, e.g.
+    "SUPREME COURT OF INDIA|CASE:CIVIL APPEAL NO 4567/2020", and by the
+    caller's unique doc_id when either is missing or the case number only
+    matched a generic pattern.
+    """
+    court = " ".join(analysis_result.get("court", "COURT NOT DETECTED").split())
+    case_number = analysis_result.get("case_no", "N/A")
+
+    if court != "COURT NOT DETECTED" and legal_text.is_specific_case_number(case_number):
+        return f"{court}|{legal_text.canonical_citation_key('case_no', case_number)}"
+    return f"DOC:{doc_id}"
+
+
+def index_judgment(graph, analysis_result, doc_id):
+    """
+    Adds an analyzed judgment and the citations found while cleaning it.
+    Its own numbers (title block citations and a specific case number)
+    become aliases. doc_id must be unique per judgment, e.g. its file path.
+    Returns the judgment's graph key.
+    """
+    key = judgment_key(analysis_result, doc_id)
+    citations = analysis_result.get("citations", [])
+    alias_keys = [citation["key"] for citation in citations if citation.get("own")]
+
+    case_number = analysis_result.get("case_no", "N/A")
+    if legal_text.is_specific_case_number(case_number):
+        alias_keys.append(legal_text.canonical_citation_key("case_no", case_number))
+
+    graph.add_judgment(
+        key,
+        [citation["key"] for citation in citations if not citation.get("own")],
+        alias_keys
+    )
+    return key
+
+
+if __name__ == "__main__":
+    # python -m engine.citations GRAPH_PATH index file1.pdf file2.pdf ...
+    # python -m engine.citations GRAPH_PATH cites|cited-by KEY
+    if len(sys.argv) < 4 or sys.argv[2] not in ("index", "cites", "cited-by"):
+        sys.exit("usage: python -m engine.citations GRAPH_PATH (index PDF [PDF ...] | cites KEY | cited-by KEY)")
+
+    citation_graph = CitationGraph(sys.argv[1])
+    command = sys.argv[2]
+
+    if command == "index":
+        # Indexing needs only the citations and the header metadata, not
+        # the summaries, so it skips the full analysis
+        for pdf_path in sys.argv[3:]:
+            with open(pdf_path, "rb") as pdf_file:
+                cleaned_text, _, citations = legal_text.clean_and_extract_citations(processor.get_text(pdf_file))
+            court, case_number, _ = legal_text.extract_metadata(cleaned_text)
+            analysis = {"court": court, "case_no": case_number, "citations": citations}
+            print(f"{pdf_path}: {index_judgment(citation_graph, analysis, pdf_path)}")
+    else:
+        lookup = citation_graph.cites if command == "cites" else citation_graph.cited_by
+        for neighbour in lookup(sys.argv[3]):
+            print(neighbour)
+
+    citation_graph.close()
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from engine import processor, summarizer, watchdog
+
+
+# 1. MINHASH SIGNATURES
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+DEFAULT_THRESHOLD = 0.85
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+CHUNK_SIZE = 4096
+
+# Fixed seed: stored signatures are only comparable if every process
+# draws the same permutations.
+_permutation_source = np.random.RandomState(20240601)
+_PERMUTATION_A = _permutation_source.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERMUTATION_B = _permutation_source.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+NearDuplicate = namedtuple("NearDuplicate", ["doc_id", "similarity", "result"])
+
+
+def shingle_hashes(cleaned_text):
+    """
+    Hashes every word shingle of the normalized text to 32 bits.
+    """
+    words = WORD_PATTERN.findall(cleaned_text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+
+    shingles = {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def minhash_signature(cleaned_text):
+    """
+    MinHash signature of the cleaned text as a uint32 array.
+    """
+    hashes = shingle_hashes(cleaned_text)
+    signature = np.full(NUM_PERMUTATIONS, MAX_HASH, dtype=np.uint64)
+
+    # Chunked so the permutation matrix stays small for long judgments
+    for offset in range(0, len(hashes), CHUNK_SIZE):
+        chunk = hashes[offset:offset + CHUNK_SIZE]
+        permuted = (np.outer(_PERMUTATION_A, chunk) + _PERMUTATION_B[:, None]) % MERSENNE_PRIME
+        permuted &= MAX_HASH
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+
+    return signature.astype(np.uint32)
+
+
+def _band_buckets(signature):
+    """
+    LSH bucket key for every band of the signature.
+    """
+    buckets = []
+    for band in range(BANDS):
+        band_bytes = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(band_bytes, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
+
+
+# 2. PERSISTENT LSH INDEX
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH table stored in SQLite.
+    Bucket lookups go through a clustered (band, bucket) key, so query cost
+    depends on the number of candidates, not on the number of documents.
+    """
+
+    def __init__(self, path, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS settings (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                result TEXT,
+                options TEXT
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, doc_id)
+            ) WITHOUT ROWID;
+        """)
+        self._check_settings()
+
+    def _check_settings(self):
+        expected = {"num_permutations": NUM_PERMUTATIONS, "bands": BANDS, "shingle_size": SHINGLE_SIZE}
+
+        with self._connection:
+            for name, value in expected.items():
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)", (name, value)
+                )
+        stored = dict(self._connection.execute("SELECT name, value FROM settings"))
+
+        if any(stored[name] != value for name, value in expected.items()):
+            raise ValueError(f"Index was built with different MinHash settings: {stored}")
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def add(self, doc_id, signature, result=None, options=None):
+        """
+        Stores a signature and, optionally, the analysis result to reuse
+        with the options key it was produced with (see analysis_options_key).
+        """
+        payload = json.dumps(result) if result is not None else None
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO signatures (doc_id, signature, result, options) VALUES (?, ?, ?, ?)",
+                (doc_id, signature.astype(np.uint32).tobytes(), payload, options)
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in _band_buckets(signature)]
+            )
+
+    def query(self, signature, options=None):
+        """
+        Best stored match at or above the threshold, preferring matches
+        whose result was produced with the given options key.
+        Returns a NearDuplicate or None; its result is None unless it was
+        produced with those options.
+        """
+        buckets = _band_buckets(signature)
+        parameters = [value for pair in buckets for value in pair]
+
+        # One primary-key point lookup per band; a row-value IN list makes
+        # SQLite scan the whole table instead
+        band_lookup = "SELECT doc_id FROM buckets WHERE band = ? AND bucket = ?"
+
+        with self._lock:
+            candidates = [row[0] for row in self._connection.execute(
+                " UNION ".join([band_lookup] * len(buckets)),
+                parameters
+            )]
+            if not candidates:
+                return None
+
+            rows = []
+            # SQLite caps bound parameters per statement
+            for offset in range(0, len(candidates), 500):
+                batch = candidates[offset:offset + 500]
+                rows.extend(self._connection.execute(
+                    f"SELECT doc_id, signature, options FROM signatures WHERE doc_id IN ({', '.join('?' * len(batch))})",
+                    batch
+                ))
+
+        stored = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), -1)
+        similarities = (stored == signature.astype(np.uint32)).mean(axis=1)
+        if similarities.max() < self.threshold:
+            return None
+
+        reusable = np.array([row[2] == options for row in rows])
+        if options is not None and (reusable & (similarities >= self.threshold)).any():
+            best = int(np.argmax(np.where(reusable, similarities, -1.0)))
+        else:
+            best = int(np.argmax(similarities))
+
+        doc_id = rows[best][0]
+        return NearDuplicate(doc_id, float(similarities[best]), self.get_result(doc_id, options))
+
+    def get_result(self, doc_id, options=None):
+        """
+        Stored analysis result for a document, or None. With an options
+        key, only a result produced with those options is returned.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result, options FROM signatures WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        if not row or not row[0] or (options is not None and row[1] != options):
+            return None
+        return json.loads(row[0])
+
+    def close(self):
+        self._connection.close()
+
+
+# 3. DEDUPLICATED INGEST
+
+def analysis_options_key(summary_engine, section_profiles):
+    """
+    Stable key of the options a result was produced with: the engine
+    that made its summaries and the resolved per-section profiles.
+    """
+    return json.dumps([summary_engine, sorted(section_profiles.items())])
+
+
+def ingest_document(index, raw_document_text, doc_id=None, engine="abstractive", profile=summarizer.DEFAULT_PROFILE,
+                    section_profiles=None, deadline=None, **analysis_options):
+    """
+    Analyzes a document unless a near-duplicate was already analyzed with
+    the same engine and decoding profiles, in which case the stored
+    result is reused.
+    The returned result carries a "dedup" entry with the matched document
+    ID and estimated Jaccard similarity. Fields holding offsets into the
+    text (offset_map, citations, source_log) are always computed for this
+    document, since duplicates differ in footers and page numbers.
+    Every stage, reused or not, is bounded by one watchdog.Deadline.
+    """
+    deadline = deadline or watchdog.Deadline()
+    resolved_profiles = summarizer.resolve_section_profiles(profile, section_profiles)
+
+    cleaned_text, offset_map, citations = summarizer.clean_within(raw_document_text, deadline)
+    cleaned_text = cleaned_text or ""
+    if doc_id is None:
+        doc_id = hashlib.sha1(cleaned_text.encode("utf-8")).hexdigest()
+
+    signature = minhash_signature(cleaned_text)
+    match = index.query(signature, analysis_options_key(engine, resolved_profiles))
+
+    if match and match.result is not None:
+        result = dict(match.result)
+        result["offset_map"] = offset_map
+        result["citations"] = citations
+        result["source_log"] = deadline.run_stage(
+            "traces", summarizer.extract_source_log, cleaned_text,
+            fallback={section: [] for section in summarizer.TRACE_KEYWORDS},
+            isolate=True
+        )
+        result["degraded"] = deadline.degraded
+        result["timeouts"] = list(deadline.timeouts)
+        result["dedup"] = {
+            "doc_id": doc_id,
+            "matched_doc_id": match.doc_id,
+            "similarity": match.similarity,
+            "reused": True,
+        }
+        return result
+
+    result = dict(summarizer.get_summarized_data(
+        raw_document_text, engine=engine, profile=profile, section_profiles=section_profiles,
+        deadline=deadline, **analysis_options
+    ))
+
+    # Results are stored under the engine that produced them, so one shed
+    # to extractive is not reused for abstractive requests. Degraded and
+    # static fallback results are not reused at all: only the signature is
+    # stored and duplicates get analyzed again.
+    if result["degraded"] or result["summary_engine"] not in summarizer.SUMMARY_ENGINES:
+        index.add(doc_id, signature)
+    else:
+        index.add(doc_id, signature, result, analysis_options_key(result["summary_engine"], resolved_profiles))
+
+    result["dedup"] = {
+        "doc_id": doc_id,
+        "matched_doc_id": match.doc_id if match else None,
+        "similarity": match.similarity if match else None,
+        "reused": False,
+    }
+    return result
+
+
+if __name__ == "__main__":
+    # Batch ingest: python -m engine.dedup INDEX_PATH file1.pdf file2.pdf ...
+    if len(sys.argv) < 3:
+        sys.exit("usage: python -m engine.dedup INDEX_PATH PDF [PDF ...]")
+
+    duplicate_index = NearDuplicateIndex(sys.argv[1])
+    for pdf_path in sys.argv[2:]:
+        with open(pdf_path, "rb") as pdf_file:
+            analysis = ingest_document(duplicate_index, processor.get_text(pdf_file), doc_id=pdf_path)
+
+        report = analysis["dedup"]
+        if report["reused"]:
+            print(f"{pdf_path}: duplicate of {report['matched_doc_id']} (similarity {report['similarity']:.2f})")
+        else:
+            print(f"{pdf_path}: analyzed")
+
+    duplicate_index.close()
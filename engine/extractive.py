@@ -0,0 +1,198 @@
+import re
+import numpy as np
+
+
+# 1. TOKENIZATION
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=["(\[]?[A-Z0-9])')
+TOKEN_PATTERN = re.compile(r"[a-z][a-z']+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in into is
+it its itself just me more most my no nor not now of off on once only or other our
+ours out over own same she should so some such than that the their theirs them then
+there these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your
+""".split())
+
+# Rough words-per-token ratio used to turn the abstractive max/min_length
+# token bounds into extractive word budgets.
+WORDS_PER_TOKEN = 0.75
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def split_sentences(text):
+    """
+    Splits text into sentences.
+    Returns a list of (start_offset, sentence) pairs.
+    """
+    sentences = []
+    position = 0
+
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[position:boundary.start()].strip()
+        if len(sentence) > 20:
+            sentences.append((position, ' '.join(sentence.split())))
+        position = boundary.end()
+
+    sentence = text[position:].strip()
+    if len(sentence) > 20:
+        sentences.append((position, ' '.join(sentence.split())))
+
+    return sentences
+
+
+def _term_pairs(sentences):
+    """
+    Tokenizes sentences into parallel (sentence_index, term_id) arrays.
+    """
+    vocabulary = {}
+    rows = []
+    cols = []
+
+    for index, sentence in enumerate(sentences):
+        for token in TOKEN_PATTERN.findall(sentence.lower()):
+            if token in STOPWORDS:
+                continue
+            rows.append(index)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), len(vocabulary)
+
+
+# 2. SCORING
+
+def _inverse_document_frequency(rows, cols, vocabulary_size, sentence_count):
+    """
+    Smoothed IDF over the whole document, treating each sentence as a document.
+    """
+    if vocabulary_size == 0:
+        return np.zeros(0)
+
+    unique_pairs = np.unique(rows * vocabulary_size + cols)
+    document_frequency = np.bincount(unique_pairs % vocabulary_size, minlength=vocabulary_size)
+
+    return np.log((1 + sentence_count) / (1 + document_frequency)) + 1.0
+
+
+def _tfidf_block(rows, cols, idf, first, last):
+    """
+    Builds the L2-normalized TF-IDF matrix for sentences [first, last).
+    Only the terms that occur in the block become columns.
+    """
+    mask = (rows >= first) & (rows < last)
+    block_rows = rows[mask] - first
+    block_terms, block_cols = np.unique(cols[mask], return_inverse=True)
+
+    term_frequency = np.zeros((last - first, max(len(block_terms), 1)))
+    np.add.at(term_frequency, (block_rows, block_cols), 1.0)
+
+    weights = np.log1p(term_frequency)
+    if len(block_terms):
+        weights *= idf[block_terms]
+
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+
+    return weights / norms
+
+
+def _centrality(weights):
+    """
+    TextRank-style centrality: PageRank over the cosine similarity graph.
+    """
+    count = weights.shape[0]
+    similarity = weights @ weights.T
+    np.fill_diagonal(similarity, 0.0)
+
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    out_weight[out_weight == 0] = 1.0
+    transition = similarity / out_weight
+
+    rank = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ rank)
+        if np.abs(updated - rank).sum() < TOLERANCE:
+            rank = updated
+            break
+        rank = updated
+
+    return rank
+
+
+def score_sentences(weights):
+    """
+    Combines graph centrality with TF-IDF salience (similarity of each
+    sentence to the block centroid) into one score per sentence.
+    """
+    centrality = _centrality(weights)
+    centroid = weights.mean(axis=0)
+    salience = weights @ centroid
+
+    if centrality.max() > 0:
+        centrality = centrality / centrality.max()
+    if salience.max() > 0:
+        salience = salience / salience.max()
+
+    return 0.6 * centrality + 0.4 * salience
+
+
+# 3. SECTION SUMMARIES
+
+def _select(sentences, scores, max_words):
+    """
+    Picks the highest scoring sentences within the word budget and
+    returns them in document order.
+    """
+    chosen = []
+    word_count = 0
+
+    for index in np.argsort(-scores, kind="stable"):
+        words = len(sentences[index].split())
+        if chosen and word_count + words > max_words:
+            continue
+        chosen.append(index)
+        word_count += words
+        if word_count >= max_words:
+            break
+
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+
+def summarize_sections(cleaned_text, section_spans):
+    """
+    Extractive summaries for every section in one pass over the document.
+    section_spans maps a section key to (start, end, max_length, min_length),
+    the same character windows and token bounds used by the abstractive model.
+    """
+    located = split_sentences(cleaned_text)
+    if not located:
+        raise ValueError("No sentences found for extractive summarization")
+
+    starts = np.asarray([start for start, _ in located])
+    sentences = [sentence for _, sentence in located]
+    rows, cols, vocabulary_size = _term_pairs(sentences)
+    idf = _inverse_document_frequency(rows, cols, vocabulary_size, len(sentences))
+
+    summaries = {}
+    for key, (start, end, max_length, _) in section_spans.items():
+        first = int(np.searchsorted(starts, start, side="left"))
+        last = int(np.searchsorted(starts, end, side="left"))
+
+        # Windows shorter than one sentence fall back to the nearest sentence
+        if last <= first:
+            first = max(0, min(first, len(sentences) - 1))
+            last = first + 1
+
+        weights = _tfidf_block(rows, cols, idf, first, last)
+        scores = score_sentences(weights)
+        max_words = max(int(max_length * WORDS_PER_TOKEN), 1)
+
+        summaries[key] = _select(sentences[first:last], scores, max_words)
+
+    return summaries
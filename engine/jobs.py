@@ -0,0 +1,161 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import processor, summarizer, viewer, watchdog
+
+
+# Documents analyzed at the same time across all sessions
+MAX_CONCURRENT_ANALYSES = int(os.environ.get("ANALYSIS_MAX_CONCURRENCY", "2"))
+
+# Share of the extraction budget spent reading pages; the rest is headroom
+# before the watchdog kills a page that hangs
+EXTRACTION_SOFT_LIMIT = 0.9
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Process-wide executor shared by every session, so the concurrency
+    limit holds no matter how many users upload at once.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_CONCURRENT_ANALYSES,
+                thread_name_prefix="analysis"
+            )
+    return _executor
+
+
+class AnalysisJob:
+    """
+    Live state of one uploaded document.
+    Written by its worker thread, read by the UI on every refresh.
+    """
+
+    def __init__(self, job_id, name):
+        self.job_id = job_id
+        self.name = name
+        self.status = "queued"
+        self.partial = {}
+        self.result = None
+        self.full_text = None
+        self.line_index = None
+        self.error = None
+        self.future = None
+        self.cancelled = threading.Event()
+        self.submitted_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+
+def run_job(job, pdf_bytes, analysis_options):
+    """
+    Extracts and analyzes one document, publishing progress on the job.
+    One deadline bounds every stage, so a pathological PDF yields a
+    degraded result instead of holding an executor thread indefinitely.
+    A discarded job stops between stages and between streamed chunks.
+    """
+    deadline = watchdog.Deadline()
+
+    try:
+        job.status = "extracting"
+        raw_text, complete = deadline.run_stage(
+            "extraction", processor.get_text_within,
+            io.BytesIO(pdf_bytes), deadline.budget("extraction") * EXTRACTION_SOFT_LIMIT,
+            fallback=("", False),
+            isolate=True
+        )
+        if not complete:
+            deadline.record_timeout("extraction")
+        if not raw_text.strip():
+            raise RuntimeError("No text could be extracted from the document")
+
+        job.full_text = raw_text
+        job.line_index = viewer.build_line_index(raw_text)
+        if job.cancelled.is_set():
+            job.status = "cancelled"
+            return
+
+        job.status = "summarizing"
+        stream = summarizer.stream_summarized_data(raw_text, deadline=deadline, **analysis_options)
+        try:
+            for key, value in stream:
+                if job.cancelled.is_set():
+                    job.status = "cancelled"
+                    return
+                if key == "result":
+                    job.result = value
+                else:
+                    # Swap in a new dict so readers never see a half-updated one
+                    job.partial = {**job.partial, key: value}
+        finally:
+            # Closing the stream cancels its queued sections and stops decoding
+            stream.close()
+
+        job.status = "done"
+    except Exception as processing_error:
+        job.error = str(processing_error)
+        job.status = "failed"
+    finally:
+        job.finished_at = time.monotonic()
+
+
+class JobQueue:
+    """
+    Jobs of one session, in upload order.
+    """
+
+    def __init__(self, executor=None):
+        self._executor = executor or get_executor()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, name, pdf_bytes, **analysis_options):
+        """
+        Queues a document once; resubmitting a known job_id is a no-op.
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                return self._jobs[job_id]
+
+            job = AnalysisJob(job_id, name)
+            job.future = self._executor.submit(run_job, job, pdf_bytes, analysis_options)
+            self._jobs[job_id] = job
+            return job
+
+    def discard(self, job_id):
+        """
+        Forgets a job, cancelling it if it has not started yet and
+        signalling it to stop if it is running.
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancelled.set()
+            job.future.cancel()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    @property
+    def pending(self):
+        return any(not job.finished for job in self.jobs())
@@ -0,0 +1,789 @@
+import bisect
+import re
+from collections import Counter
+
+import numpy as np
+
+
+# 1. COURT & CASE PATTERNS
+
+
+COURT_PATTERNS = [
+    # Supreme Court
+    r"IN THE (SUPREME COURT OF INDIA)",
+    r"(SUPREME COURT OF INDIA)",
+    r"BEFORE THE (SUPREME COURT OF INDIA)",
+    
+    # High Courts - Generic
+    r"IN THE (HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
+    r"IN THE (HIGH COURT OF [A-Z\s]+)",
+    r"(HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
+    r"(HIGH COURT OF [A-Z\s]+)",
+    r"BEFORE THE (HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
+    
+    # Major High Courts
+    r"(DELHI HIGH COURT)",
+    r"(BOMBAY HIGH COURT)",
+    r"(CALCUTTA HIGH COURT)",
+    r"(MADRAS HIGH COURT)",
+    r"(KARNATAKA HIGH COURT)",
+    r"(KERALA HIGH COURT)",
+    r"(GUJARAT HIGH COURT)",
+    r"(ALLAHABAD HIGH COURT)",
+    r"(PUNJAB AND HARYANA HIGH COURT)",
+    r"(RAJASTHAN HIGH COURT)",
+    r"(MADHYA PRADESH HIGH COURT)",
+    r"(ANDHRA PRADESH HIGH COURT)",
+    r"(TELANGANA HIGH COURT)",
+    r"(ORISSA HIGH COURT)",
+    r"(PATNA HIGH COURT)",
+    r"(CHHATTISGARH HIGH COURT)",
+    r"(JHARKHAND HIGH COURT)",
+    r"(UTTARAKHAND HIGH COURT)",
+    r"(HIMACHAL PRADESH HIGH COURT)",
+    r"(JAMMU AND KASHMIR HIGH COURT)",
+    r"(GAUHATI HIGH COURT)",
+    r"(GUWAHATI HIGH COURT)",
+    
+    # Lower Courts
+    r"(DISTRICT COURT OF [A-Z\s]+)",
+    r"(DISTRICT COURT[,\s]+[A-Z\s]+)",
+    r"IN THE COURT OF (DISTRICT JUDGE[,\s]+[A-Z\s]+)",
+    r"(DISTRICT & SESSIONS COURT[,\s]+[A-Z\s]+)",
+    r"(SESSIONS COURT[,\s]+[A-Z\s]+)",
+    r"(SESSIONS COURT AT [A-Z\s]+)",
+    r"(COURT OF SESSIONS JUDGE[,\s]+[A-Z\s]+)",
+    r"(ADDITIONAL SESSIONS JUDGE[,\s]+[A-Z\s]+)",
+    
+    # Special Courts
+    r"(SPECIAL COURT FOR [A-Z\s]+)",
+    r"(CBI COURT[,\s]+[A-Z\s]+)",
+    r"(FAMILY COURT[,\s]+[A-Z\s]+)",
+    
+    # Tribunals
+    r"(NATIONAL GREEN TRIBUNAL)",
+    r"(ARMED FORCES TRIBUNAL)",
+    r"(CENTRAL ADMINISTRATIVE TRIBUNAL)",
+]
+
+CASE_NO_PATTERNS = [
+    # Writ Petitions
+    r"W\.?\s*P\.?\s*\(?(C|CR|Civil|Criminal|Crl\.?)\)?\s*(?:D\s+)?No\.?\s*\d+\s*(?:/|of)\s*\d{4}",
+    r"WP\s*\(C\)\s*No\.?\s*\d+/\d{4}",
+    r"WRIT PETITION\s*\((?:CIVIL|CRIMINAL)\)\s*NO\.?\s*\d+/\d{4}",
+    r"Writ Petition Misc\.\s+Single No\.\s*\d+\s+of\s+\d{4}",
+    r"WRIT\s+PETITION\s+\(CIVIL\)\s+NO\.\d+\s+OF\s+\d{4}",
+    r"WRIT\s+PETITION\s+\(CRIMINAL\)\s+D\s+NO\.\d+\s+OF\s+\d{4}",
+    # Appeals
+    r"(?:Civil|Criminal)\s+Appeal\s*(?:No\.?)?\s*\d+\s*(?:/|of)\s*\d{4}",
+    r"R/CRIMINAL APPEAL\s*\(AGAINST CONVICTION\)\s*NO\.\s*\d+\s+of\s+\d{4}",
+    r"Criminal Appeal No\.\s*\d+\s+of\s+\d{4}",
+    r"\bWRIT\s+PETITION\s*\(\s*(?:CIVIL|CRIMINAL)\s*\)\s*NO\.?\s*\d+\s*OF\s*\d{4}\b",
+    r"\bWRIT\s+PETITION\s*\(\s*(?:CIVIL|CRIMINAL)\s*\)\s*D\s*NO\.?\s*\d+\s*OF\s*\d{4}\b",
+    r"\b(?:CIVIL|CRIMINAL)\s+APPEAL\s+NO\.?\s*\d+\s*OF\s*\d{4}\b",
+    r"\b(?:CIVIL|CRIMINAL)\s+APPEAL\s+NOS?\.?\s*\d+(?:\s*[-–]\s*\d+)?\s*OF\s*\d{2}\s*\d{2}\b",
+    r"\bAPPEAL\s*(?:\(\s*CRL\.?\s*\))?\s*\d+\s*of\s*\d{4}\b",
+    # Special Leave
+    r"SLP\s*\(?(?:Civil|Crl\.?|Criminal|C|Crl)\)?\s*No\.?\s*\d+\s*(?:/|of)\s*\d{4}",
+    r"SPECIAL LEAVE PETITION\s*\((?:CIVIL|CRIMINAL)\)\s*NO\.?\s*\d+/\d{4}",
+    
+    # Generic Case Numbers
+    r"Case No\.\s*\d+\s+of\s+\d{4}",
+    r"\b(?:CRLA|CRA|CWP|RSA|FAO|LPA|WA|CMP|COCP|MAT|WPC)\s*No\.?\s*\d+/\d{4}",
+    
+    # CNR Numbers
+    r"\b\d{4}\s+IN[SHD]C\s+\d+\b",
+    r"\b[A-Z0-9]{16}\b",
+    
+    # Fallback
+    r"No\.?\s*\d+\s*(?:of|/)\s*\d{4}",
+]
+
+# Case-number patterns too generic to be treated as citations
+GENERIC_CASE_NO_PATTERNS = {
+    r"\b[A-Z0-9]{16}\b",
+    r"No\.?\s*\d+\s*(?:of|/)\s*\d{4}",
+}
+
+# Case numbers specific enough to be cited, or to identify a judgment
+# together with its court
+SPECIFIC_CASE_NO_PATTERNS = [
+    pattern for pattern in CASE_NO_PATTERNS if pattern not in GENERIC_CASE_NO_PATTERNS
+]
+
+# Leading word of every specific case-number pattern (neutral citations
+# have their own branch), grouped by first letter so most positions fail
+# on one character. The case-number branch is only tried where one of
+# these starts, instead of trying every pattern at every position.
+CASE_NO_PREFIX = (
+    r"W(?:\.?\s*P|RIT|A)|C(?:IVIL|RIMINAL|RLA|RA|WP|MP|OCP|ASE)"
+    r"|R(?:/CRIMINAL|SA)|APPEAL|S(?:LP|PECIAL)|FAO|LPA|MAT"
+)
+
+# Every character a citation can start with. Keep in step with the
+# branches below and CASE_NO_PREFIX.
+CITATION_FIRST_CHARS = r"[\[(\dWCRASFLMwcrasflm]"
+
+# One matcher for everything citation-like, tried in this order at each
+# position. Reporter citations and the bare [n] / (yyyy) markers are
+# removed from the cleaned text; neutral citations and case numbers are
+# only recorded.
+CITATION_PATTERN = re.compile(
+    r"(?=" + CITATION_FIRST_CHARS + r")(?:"
+    r"(?P<reporter>[\[(]\d{4}[\])]\s*\d+\s+(?:SCC|SCR|SCALE)\s+\d+"
+    r"|\b(?:AIR|SCC|SCR)\s+\d{4}\s+\w+\s+\d+)"
+    r"|(?P<neutral>\b\d{4}\s+IN[SHD]C\s+\d+\b|\b\d{4}:[A-Z]{2,6}:\d+\b)"
+    r"|(?i:(?P<case_no>(?=" + CASE_NO_PREFIX + r")(?:" + "|".join(
+        f"(?:{pattern})" for pattern in SPECIFIC_CASE_NO_PATTERNS
+    ) + r")))"
+    r"|(?P<paragraph>\[\d+\])"
+    r"|(?P<year>\(\d{4}\))"
+    r")"
+)
+
+CITATION_KINDS = ("reporter", "neutral", "case_no")
+
+# The judgment's own title block runs up to its JUDGMENT / ORDER heading,
+# looked for in the first CITATION_HEADER_CHARS; without a heading, the
+# first CITATION_HEADER_FALLBACK_CHARS are taken as the title block.
+# Citations found there are the judgment's own numbers and are flagged "own".
+JUDGMENT_HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?:COMMON[ \t]+)?"
+    r"(?:J[ \t]*U[ \t]*D[ \t]*G[ \t]*(?:E[ \t]*)?M[ \t]*E[ \t]*N[ \t]*T|O[ \t]*R[ \t]*D[ \t]*E[ \t]*R)"
+    r"[ \t]*:?[ \t]*$",
+    re.I | re.M
+)
+CITATION_HEADER_CHARS = 5000
+CITATION_HEADER_FALLBACK_CHARS = 1500
+
+
+def canonical_citation_key(kind, citation_text):
+    """
+    Normalizes a citation to a stable key, so the same judgment cited in
+    different styles maps to one node, e.g.
+    "(2019) 3 SCC 123" -> "SCC:2019:3:123", "2023 INSC 45" -> "INSC:2023:45".
+    """
+    text = " ".join(citation_text.upper().split())
+    
+    if kind == "reporter":
+        volume_style = re.match(r"[\[(](\d{4})[\])]\s*(\d+)\s+(\w+)\s+(\d+)", text)
+        if volume_style:
+            year, volume, reporter, page = volume_style.groups()
+            return f"{reporter}:{year}:{volume}:{page}"
+        reporter, year, bench, page = text.split()[:4]
+        return f"{reporter}:{year}:{bench}:{page}"
+    
+    if kind == "neutral":
+        year, court, number = re.split(r"[\s:]+", text)[:3]
+        return f"{court}:{year}:{number}"
+    
+    # Case numbers: drop punctuation noise and unify "of yyyy" / "/yyyy"
+    text = text.replace(".", "")
+    text = re.sub(r"\s*(?:/|\bOF\b)\s*(\d{2}\s*\d{2})\b", lambda m: "/" + m.group(1).replace(" ", ""), text)
+    text = re.sub(r"\s*\(\s*", "(", text)
+    text = re.sub(r"\s*\)\s*", ") ", text)
+    return "CASE:" + " ".join(text.split())
+
+
+def is_specific_case_number(case_number):
+    """
+    True when case_number is matched in full by a specific (non-generic)
+    case-number pattern, such as "Civil Appeal No. 12 of 2019".
+    """
+    return any(re.fullmatch(pattern, case_number, re.I) for pattern in SPECIFIC_CASE_NO_PATTERNS)
+
+
+# 2. TEXT CLEANING & PREPROCESSING
+
+def _rebuild(text, positions, pieces):
+    """
+    Joins pieces of the current text while carrying raw offsets along.
+    Each piece is either a (start, end) span of text, or a
+    (replacement, anchor) pair whose characters all map to anchor.
+    """
+    parts = []
+    mapped = []
+    
+    for first, second in pieces:
+        if isinstance(first, str):
+            parts.append(first)
+            mapped.append(np.full(len(first), second, dtype=np.int64))
+        else:
+            parts.append(text[first:second])
+            mapped.append(positions[first:second])
+    
+    if not parts:
+        return "", np.zeros(0, dtype=np.int64)
+    
+    return "".join(parts), np.concatenate(mapped)
+
+
+def _tracked_sub(pattern, replacement, text, positions, flags=0):
+    """
+    re.sub that keeps the cleaned-to-raw offset array in step.
+    replacement may be a string or, as with re.sub, a function of the match.
+    Matches already equal to their replacement are left untouched.
+    """
+    pieces = []
+    last_end = 0
+    
+    for match in re.finditer(pattern, text, flags):
+        substitute = replacement(match) if callable(replacement) else replacement
+        if match.group(0) == substitute:
+            continue
+        pieces.append((last_end, match.start()))
+        if substitute:
+            anchor = positions[min(match.start(), len(positions) - 1)]
+            pieces.append((substitute, anchor))
+        last_end = match.end()
+    
+    if not pieces:
+        return text, positions
+    
+    pieces.append((last_end, len(text)))
+    return _rebuild(text, positions, pieces)
+
+
+def _tracked_keep_lines(text, positions, keep_line):
+    """
+    Drops the lines rejected by keep_line, joining survivors with newlines.
+    """
+    kept_spans = []
+    line_start = 0
+    
+    for line in text.split('\n'):
+        if keep_line(line):
+            kept_spans.append((line_start, line_start + len(line)))
+        line_start += len(line) + 1
+    
+    # Every kept line but the last carries its own trailing newline
+    pieces = [(start, end + 1) for start, end in kept_spans[:-1]] + kept_spans[-1:]
+    return _rebuild(text, positions, pieces)
+
+
+def build_offset_map(positions):
+    """
+    Compresses a per-character raw offset array into runs.
+    Returns {"clean_starts": [...], "raw_starts": [...]}, JSON-serializable.
+    """
+    if len(positions) == 0:
+        return {"clean_starts": [0], "raw_starts": [0]}
+    
+    run_starts = np.concatenate(([0], np.flatnonzero(np.diff(positions) != 1) + 1))
+    
+    return {
+        "clean_starts": run_starts.tolist(),
+        "raw_starts": positions[run_starts].tolist(),
+    }
+
+
+def to_raw_offset(offset_map, clean_offset):
+    """
+    Translates an offset in cleaned text (e.g. a trace [Ref ID]) to the
+    matching offset in the raw extracted text.
+    """
+    run = max(bisect.bisect_right(offset_map["clean_starts"], clean_offset) - 1, 0)
+    return offset_map["raw_starts"][run] + clean_offset - offset_map["clean_starts"][run]
+
+
+def _title_block_end(raw_text):
+    """
+    Raw offset where the judgment's own title block ends.
+    """
+    heading = JUDGMENT_HEADING_PATTERN.search(raw_text[:CITATION_HEADER_CHARS])
+    return heading.start() if heading else CITATION_HEADER_FALLBACK_CHARS
+
+
+def _mark_own_citations(citations, title_block_end, kept_positions):
+    """
+    First occurrence of each citation key, flagged "own" when it is one of
+    the judgment's own numbers: found in its title block, or on page
+    header/footer lines removed as repeated (citations kept in the text
+    must survive cleaning). A key seen as own anywhere is own.
+    """
+    own_keys = set()
+    unique = {}
+    
+    for citation in citations:
+        offset = citation["offset"]
+        if offset < title_block_end:
+            own_keys.add(citation["key"])
+        elif citation["kind"] != "reporter":
+            kept_at = np.searchsorted(kept_positions, offset)
+            if kept_at == len(kept_positions) or kept_positions[kept_at] != offset:
+                own_keys.add(citation["key"])
+        unique.setdefault(citation["key"], citation)
+    
+    return [{**citation, "own": citation["key"] in own_keys} for citation in unique.values()]
+
+
+def clean_legal_text(raw_text, return_offsets=False):
+    """
+    Removes common PDF artifacts and noise from legal documents.
+    Returns cleaned text ready for NLP processing, or
+    (cleaned_text, offset_map) when return_offsets is set.
+    """
+    text, offset_map, citations = clean_and_extract_citations(raw_text)
+    
+    if return_offsets:
+        return text, offset_map
+    return text
+
+
+def clean_and_extract_citations(raw_text):
+    """
+    Cleans the document and, in the same pass that strips citations,
+    collects them. Returns (cleaned_text, offset_map, citations), where
+    each citation is {"key", "kind", "text", "offset", "own"} with offset
+    into the raw text. Each key is listed once; "own" marks the judgment's
+    own numbers rather than citations of other judgments.
+    """
+    if not raw_text or len(raw_text) < 10:
+        return raw_text, build_offset_map(np.arange(len(raw_text or ""), dtype=np.int64)), []
+    
+    text = raw_text
+    positions = np.arange(len(raw_text), dtype=np.int64)
+    
+    # Remove page markers
+    text, positions = _tracked_sub(r'\bPage\s+\d+(?:\s+of\s+\d+)?\b', '', text, positions, flags=re.I)
+    text, positions = _tracked_sub(r'^\s*\d+\s*$', '', text, positions, flags=re.M)
+    
+    # Remove download artifacts
+    text, positions = _tracked_sub(r'https?://[^\s]+', '', text, positions)
+    text, positions = _tracked_sub(r'Downloaded from[^\n]+', '', text, positions, flags=re.I)
+    
+    # Collect citations and remove reporter citations and markers
+    citations = []
+    
+    def record_citation(match):
+        kind = match.lastgroup
+        if kind in CITATION_KINDS:
+            citations.append({
+                "key": canonical_citation_key(kind, match.group(0)),
+                "kind": kind,
+                "text": " ".join(match.group(0).split()),
+                "offset": int(positions[match.start()]),
+            })
+        return match.group(0) if kind in ("neutral", "case_no") else ''
+    
+    text, positions = _tracked_sub(CITATION_PATTERN, record_citation, text, positions)
+    
+    # Detect and remove repeated lines (headers/footers)
+    lines = text.split('\n')
+    line_frequency = Counter([line.strip() for line in lines if len(line.strip()) > 10])
+    repeated_lines = {line for line, count in line_frequency.items() if count >= 3}
+    
+    text, positions = _tracked_keep_lines(text, positions, lambda line: line.strip() not in repeated_lines)
+    
+    # Remove very short lines (likely artifacts)
+    text, positions = _tracked_keep_lines(text, positions, lambda line: len(line.strip()) > 2)
+    
+    # Normalize spacing
+    text, positions = _tracked_sub(r' {2,}', ' ', text, positions)
+    text, positions = _tracked_sub(r'\n\n+', '\n\n', text, positions)
+    
+    leading = len(text) - len(text.lstrip())
+    trailing = len(text.rstrip())
+    text, positions = text[leading:trailing], positions[leading:trailing]
+    
+    citations = _mark_own_citations(citations, _title_block_end(raw_text), positions)
+    
+    return text, build_offset_map(positions), citations
+
+# 3. PARTY NAME NORMALIZATION
+
+def normalize_party_name(raw_party_text):
+    """
+    Extracts clean party names from text blocks containing addresses,
+    personal details, and legal markers.
+    """
+    lines = raw_party_text.split('\n')
+    extracted_names = []
+    
+    # Common markers that indicate address/personal details start
+    address_markers = [
+        "s/o", "d/o", "w/o", "aged", "r/o", "resident", 
+        "village", "dist", "pin", "po-", "ps-",
+        "advocate", "counsel", "through", "represented by"
+    ]
+    
+    for line in lines:
+        line = line.strip()
+        
+        # Skip empty or very short lines
+        if not line or len(line) < 3:
+            continue
+        
+        # Check if line contains address markers
+        line_lower = line.lower()
+        has_address_marker = any(marker in line_lower for marker in address_markers)
+        
+        if has_address_marker:
+            # Extract name before the marker
+            for marker in address_markers:
+                if marker in line_lower:
+                    name_before_marker = line.split(marker, 1)[0].strip()
+                    name_before_marker = re.sub(r'[,\.\-]+$', '', name_before_marker)
+                    if len(name_before_marker) > 3:
+                        extracted_names.append(name_before_marker)
+                    break
+            break  # Stop after finding address details
+        
+        # Remove common trailing labels
+        line = re.sub(
+            r"\.{3,}|\b\d+\.|\b(Petitioner|Respondent|Appellant|Accused|Applicant)\b.*", 
+            "", 
+            line, 
+            flags=re.I
+        ).strip()
+        
+        if line and len(line) > 2:
+            extracted_names.append(line)
+            
+            # Usually 1-2 lines is sufficient for a name
+            if len(extracted_names) >= 2:
+                break
+    
+    # Return formatted result
+    if not extracted_names:
+        return "Party Details Not Found"
+    
+    result = " ".join(extracted_names[:2])
+    if len(extracted_names) > 2:
+        result += " & Ors"
+    
+    return result
+
+
+# 4. ADVANCED PARTY EXTRACTION ENGINE
+
+def extract_parties_advanced(document_text):
+    """
+    Multi-strategy party extraction system.
+    Handles various Indian legal document formats.
+    """
+    if not document_text:
+        return None
+    
+    # Normalize whitespace
+    document_text = re.sub(r'\s+', ' ', document_text)
+    header_section = document_text[:30000]
+    
+    # Remove common noise patterns
+    header_section = re.sub(
+        r'Approved\s+for\s+Reporting\s+(?:Yes|No|YesNo)', 
+        '', 
+        header_section, 
+        flags=re.I
+    )
+    
+    petitioner = None
+    respondent = None
+    
+    # ========== STRATEGY 1: Multi-word Authority Format ==========
+    # Pattern: "Authority Name\nPetitioner\nVersus\nRespondent Name\nRespondents"
+    # Common in PIL cases and institutional petitions
+    
+    authority_pattern = re.search(
+        r'([A-Z][A-Za-z\s&\.,()-]{10,150}?)\s+Petitioner\s+Versus\s+([A-Z][A-Za-z\s&\.,()-]{10,150}?)\s+Respondents?',
+        header_section,
+        re.IGNORECASE
+    )
+    
+    if authority_pattern:
+        petitioner = authority_pattern.group(1).strip()
+        respondent = authority_pattern.group(2).strip()
+        
+        # Normalize "and others" variations
+        petitioner = re.sub(r'\s*(?:and|&)\s*(?:others?|ors?\.?)', ' & Ors', petitioner, flags=re.I)
+        respondent = re.sub(r'\s*(?:and|&)\s*(?:others?|ors?\.?)', ' & Ors', respondent, flags=re.I)
+        
+        return f"{petitioner}\n-vs-\n{respondent}"
+    
+    # ========== STRATEGY 2: Labeled Colon Format ==========
+    # Pattern: "PETITIONER:\nName\nVs.\nRESPONDENT:\nName"
+    
+    colon_pattern = re.search(
+        r'PETITIONER\s*:\s*(?:\d+\.\s*)?([A-Z][A-Za-z\s&\.,()-]+?)\s+Vs\.\s+RESPONDENT\s*:\s*([A-Z][A-Za-z\s&\.,()-]+)',
+        header_section,
+        re.IGNORECASE | re.DOTALL
+    )
+    
+    if colon_pattern:
+        petitioner = colon_pattern.group(1).strip()
+        respondent = colon_pattern.group(2).strip()
+        
+        # Remove parenthetical content
+        petitioner = re.sub(r'\s*\(.*?\)', '', petitioner)
+        respondent = re.sub(r'\s*\(.*?\)', '', respondent)
+        
+        return f"{petitioner}\n-vs-\n{respondent}"
+    
+    # ========== STRATEGY 3: Company/Organization Format ==========
+    # Pattern: "M/s Company Name ... Petitioner"
+    
+    company_pattern = re.search(
+        r'(M/s\s+[A-Za-z\s,\.]+?)(?:\s*--?\s*Petitioner|\s+Versus)',
+        header_section,
+        re.IGNORECASE
+    )
+    
+    if company_pattern:
+        petitioner = company_pattern.group(1).strip()
+        petitioner = re.sub(r'\s*,.*$', '', petitioner)  # Remove address after comma
+        
+        # Find respondent after Versus
+        versus_position = header_section[company_pattern.end():]
+        respondent_match = re.search(
+            r'Versus\s+([A-Z][A-Za-z\s,\.&]+?)(?:\s*--?\s*Respondent|\s+With)',
+            versus_position,
+            re.IGNORECASE
+        )
+        
+        if respondent_match:
+            respondent = respondent_match.group(1).strip()
+            respondent = re.sub(r'\s*,.*$', '', respondent)
+            return f"{petitioner}\n-vs-\n{respondent}"
+    
+    # ========== STRATEGY 4: All-Caps With Dots Format ==========
+    # Pattern: "NAME ... PETITIONER\nVERSUS\nNAME ... RESPONDENT"
+    
+    caps_dots_pattern = re.search(
+        r'([A-Z][A-Z\s]+[A-Z])\s+\.{3,}\s*PETITIONER\s+VERSUS\s+([A-Z][A-Z\s]+[A-Z])\s+\.{3,}\s*RESPONDENT',
+        header_section,
+        re.IGNORECASE
+    )
+    
+    if caps_dots_pattern:
+        petitioner = caps_dots_pattern.group(1).strip()
+        respondent = caps_dots_pattern.group(2).strip()
+        
+        # Convert to title case for readability
+        petitioner = ' '.join(word.capitalize() for word in petitioner.split())
+        respondent = ' '.join(word.capitalize() for word in respondent.split())
+        
+        return f"{petitioner}\n-vs-\n{respondent}"
+    
+    # ========== STRATEGY 5: Title With Address Format ==========
+    # Pattern: "Smt./Shri Name, address details ... Petitioner"
+    
+    title_pattern = re.search(
+        r'((?:Smt\.|Shri|Sri|Dr\.|M/s|Mr\.|Mrs\.|Ms\.)\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        header_section,
+        re.IGNORECASE
+    )
+    
+    if title_pattern:
+        petitioner = title_pattern.group(1).strip()
+        
+        # Find Versus marker after petitioner
+        versus_marker = re.search(
+            r'(?:VERSUS|Versus|V/S|VS)', 
+            header_section[title_pattern.end():], 
+            re.I
+        )
+        
+        if versus_marker:
+            after_versus = header_section[title_pattern.end() + versus_marker.end():]
+            
+            # Look for State/Union pattern
+            government_pattern = re.search(
+                r'(?:1\.\s*)?(?:The\s+)?((?:State|Union)\s+of\s+[A-Z][a-z]+)',
+                after_versus[:500],
+                re.IGNORECASE
+            )
+            
+            if government_pattern:
+                respondent = government_pattern.group(1)
+                return f"{petitioner}\n-vs-\n{respondent}"
+    
+    # ========== STRATEGY 6: Standard Versus Split ==========
+    # Pattern: "Name VERSUS Name"
+    
+    versus_split = re.search(
+        r'([A-Z][A-Za-z\s\.]{5,80}?)\s+(?:VERSUS|versus|Versus|V/S|v/s|VS|vs\.?)\s+([A-Z][A-Za-z\s\.&]{5,80})',
+        header_section[:5000]
+    )
+    
+    if versus_split:
+        petitioner = versus_split.group(1).strip()
+        respondent = versus_split.group(2).strip()
+        
+        # Remove date references
+        petitioner = re.sub(r'\s*on\s+\d+.*$', '', petitioner, flags=re.I)
+        respondent = re.sub(r'\s*on\s+\d+.*$', '', respondent, flags=re.I)
+        
+        # Filter out court names and noise
+        noise_keywords = [
+            'SUPREME COURT', 'HIGH COURT', 'SESSIONS', 'COURT OF',
+            'Approved', 'Reporting', 'YesNo', 'Appearance'
+        ]
+        
+        if not any(keyword in petitioner for keyword in noise_keywords):
+            return f"{petitioner}\n-vs-\n{respondent}"
+    
+    return "Parties Not Detected"
+
+
+def extract_parties(document_text):
+    """
+    Main party extraction function with fallback logic.
+    Tries advanced strategies first, then falls back to original logic.
+    """
+    header = document_text[:6000].replace('\r', '')
+    header = re.split(r"\n\s*WITH\s*\n", header, flags=re.I)[0]
+
+    # Try advanced extraction first
+    advanced_result = extract_parties_advanced(document_text)
+    if advanced_result and advanced_result != "Parties Not Detected":
+        return advanced_result
+
+    # Fallback Strategy 1: Anchor Block Match
+    anchor_pattern = r"(?:No\.?|Petition|Appeal|SLP|CRL\.A)(?:[\s\S]+?\d{4})?([\s\S]+?)\s+(?:VERSUS|V/S|VS\.?)\s+([\s\S]+?)(?=\n\s*(?:ORDER|JUDGMENT|BEFORE|JUSTICE|CORAM|DATED|PRESENT))"
+    match = re.search(anchor_pattern, header, re.I)
+    
+    if match:
+        petitioner = normalize_party_name(match.group(1))
+        respondent = normalize_party_name(match.group(2))
+        
+        if "Court" not in petitioner and len(petitioner) > 2:
+            return f"{petitioner}\n-vs-\n{respondent}"
+
+    # Fallback Strategy 2: Positional Split
+    versus_markers = [r"\n\s*VERSUS\s*\n", r"\n\s*V/S\s*\n", r"\n\s*VS\.?\s*\n"]
+    
+    for marker in versus_markers:
+        split_result = re.split(marker, header, maxsplit=1, flags=re.I)
+        
+        if len(split_result) == 2:
+            # Get last 4 lines before VERSUS
+            before_lines = [l for l in split_result[0].strip().split('\n') if len(l.strip()) > 2][-4:]
+            # Get first 4 lines after VERSUS
+            after_lines = [l for l in split_result[1].strip().split('\n') if len(l.strip()) > 2][:4]
+            
+            petitioner_text = "\n".join(before_lines)
+            respondent_text = "\n".join(after_lines)
+            
+            petitioner = normalize_party_name(petitioner_text)
+            respondent = normalize_party_name(respondent_text)
+            
+            if len(petitioner) > 3:
+                return f"{petitioner}\n-vs-\n{respondent}"
+
+    return "Parties Not Detected"
+
+
+# 5. METADATA & TRACE EXTRACTION
+
+
+def extract_metadata(cleaned_text):
+    """
+    Detects court name, case number and jurisdiction from the header.
+    Returns (court_name, case_number, jurisdiction_type).
+    """
+    # Prepare text sections for analysis
+    header_section = cleaned_text[:5000].replace('\r', '')
+
+    # ========== EXTRACT COURT NAME ==========
+    court_name = "COURT NOT DETECTED"
+    
+    for pattern in COURT_PATTERNS:
+        court_match = re.search(pattern, header_section, re.I)
+        if court_match:
+            court_name = court_match.group(0).upper()
+            # Clean up prefixes
+            court_name = re.sub(r'^(?:IN THE|BEFORE THE|THE)\s+', '', court_name)
+            court_name = re.sub(r"HON'?BLE\s+", '', court_name)
+            break
+    
+    # Flexible fallback for unmatched courts
+    if court_name == "COURT NOT DETECTED":
+        flexible_court = re.search(
+            r'(HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+|SESSIONS COURT AT [A-Z\s]+)',
+            header_section,
+            re.I
+        )
+        if flexible_court:
+            court_name = flexible_court.group(1).upper()
+
+    # ========== EXTRACT CASE NUMBER ==========
+    case_number = "N/A"
+    
+    for pattern in CASE_NO_PATTERNS:
+        case_match = re.search(pattern, header_section, re.I)
+        if case_match:
+            case_number = case_match.group(0).strip()
+            break
+
+    # ========== DETERMINE JURISDICTION ==========
+    jurisdiction_patterns = {
+        "Writ Jurisdiction": r"(?i)(article\s+(?:226|32|227|136|142|141)|writ\s+petition|constitutional\s+remedy|writ\s+of\s+(?:habeas corpus|mandamus|prohibition|certiorari|quo warranto))",
+        "Appellate Jurisdiction": r"(?i)(civil\s+appeal|criminal\s+appeal|special\s+leave\s+petition|appellate\s+jurisdiction|regular\s+(?:first|second)\s+appeal)",
+        "Original Jurisdiction": r"(?i)(original\s+suit|civil\s+original|original\s+side|original\s+jurisdiction)",
+        "Bail Jurisdiction": r"(?i)(bail\s+application|anticipatory\s+bail|section\s+(?:438|439|437|436|167)|regular\s+bail)",
+        "Revisional Jurisdiction": r"(?i)(civil\s+revision|criminal\s+revision|revisional\s+jurisdiction|revision\s+petition)",
+        "Criminal Original Jurisdiction": r"(?i)(criminal\s+complaint|complaint\s+case|section\s+(?:138|156|200|340|482))",
+        "Contempt Jurisdiction": r"(?i)(contempt\s+of\s+court|criminal\s+contempt|civil\s+contempt)",
+        "Execution Jurisdiction": r"(?i)(execution\s+petition|execution\s+proceedings|decree\s+execution)",
+        "General Jurisdiction": r".*",
+    }
+    
+    jurisdiction_type = "General Jurisdiction"
+    
+    for label, pattern in jurisdiction_patterns.items():
+        if label != "General Jurisdiction" and re.search(pattern, header_section, re.I):
+            jurisdiction_type = label
+            break
+
+    return court_name, case_number, jurisdiction_type
+
+
+def extract_verbatim_sentences(cleaned_text, keyword_list):
+    """
+    Finds and extracts complete sentences containing specified keywords.
+    Returns sentences with reference IDs for traceability.
+    """
+    extracted_sentences = []
+    
+    for keyword in keyword_list:
+        # Pattern to match complete sentences containing the keyword
+        sentence_pattern = rf"([A-Z][^.!?]*?\b{keyword}\b[^.!?]*?[.!?])"
+        
+        for match in re.finditer(sentence_pattern, cleaned_text, re.I | re.DOTALL):
+            sentence = match.group().strip()
+            
+            # Filter by length (avoid fragments and overly long matches)
+            if 30 < len(sentence) < 500:
+                reference_id = match.start()
+                extracted_sentences.append(f"[Ref ID: {reference_id}] {sentence}")
+    
+    # Remove duplicates while preserving order
+    unique_sentences = list(dict.fromkeys(extracted_sentences))
+    
+    return unique_sentences[:5]  # Return top 5 matches
+
+
+TRACE_KEYWORDS = {
+    "Case Background Trace": [
+        "fact", "background", "incident", "allegation", 
+        "accused", "victim", "petitioner", "appellant", "case"
+    ],
+    "Court Observation Trace": [
+        "observed", "held", "court", "opined", "noted", 
+        "finding", "concluded", "reasoning"
+    ],
+    "Final Decision Trace": [
+        "directed", "ordered", "dismissed", "allowed", 
+        "disposed", "decree", "judgment", "held that"
+    ],
+}
+
+
+def extract_source_log(cleaned_text):
+    """
+    Verbatim supporting sentences for each trace section.
+    """
+    return {
+        section: extract_verbatim_sentences(cleaned_text, keywords)
+        for section, keywords in TRACE_KEYWORDS.items()
+    }
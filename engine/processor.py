@@ -1,3 +1,4 @@
+import time
 import PyPDF2
 
 def get_text(file):
@@ -6,3 +7,17 @@ def get_text(file):
     for page in reader.pages:
         full_text += page.extract_text() + "\n"
     return full_text
+
+def get_text_within(file, seconds):
+    """
+    Like get_text, but stops between pages once the time is up.
+    Returns (text, complete).
+    """
+    stop_at = time.monotonic() + seconds
+    reader = PyPDF2.PdfReader(file)
+    full_text = ""
+    for page in reader.pages:
+        if time.monotonic() >= stop_at:
+            return full_text, False
+        full_text += page.extract_text() + "\n"
+    return full_text, True
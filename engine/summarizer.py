@@ -1,596 +1,633 @@
-import re
-from transformers import pipeline
+import os
+import threading
+import time
+from transformers import pipeline, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 import streamlit as st
-from collections import Counter
+import numpy as np
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from engine import extractive, watchdog, workers
+# Text processing lives in legal_text so stage workers need not load the
+# model stack; these names remain available from here
+from engine.legal_text import (
+    CASE_NO_PATTERNS,
+    COURT_PATTERNS,
+    TRACE_KEYWORDS,
+    build_offset_map,
+    canonical_citation_key,
+    clean_and_extract_citations,
+    clean_legal_text,
+    extract_metadata,
+    extract_parties,
+    extract_parties_advanced,
+    extract_source_log,
+    extract_verbatim_sentences,
+    is_specific_case_number,
+    normalize_party_name,
+    to_raw_offset,
+)
+
+
+
+# 1. NLP MODEL INITIALIZATION
+
+SUMMARY_ENGINES = ("abstractive", "extractive")
+
+FALLBACK_SUMMARIES = {
+    "exec_summary": "Summarization processing encountered an error.",
+    "background": "Unable to generate background summary.",
+    "issues": "Unable to extract issues.",
+    "observations": "Unable to extract observations.",
+    "decision": "Unable to extract decision.",
+}
+
+# Overload shedding (0 disables): abstractive requests switch to the
+# extractive engine when this many documents are already in the model,
+# or when recent documents exceeded the latency budget in seconds.
+MAX_INFLIGHT_SUMMARIES = int(os.environ.get("SUMMARIZER_MAX_INFLIGHT", "0"))
+LATENCY_BUDGET_SECONDS = float(os.environ.get("SUMMARIZER_LATENCY_BUDGET", "0"))
+LATENCY_WINDOW_SECONDS = 60.0
+
+# Sharded execution (0 disables): section summaries run in this many model
+# worker processes, each pinned to its own cores with this many torch threads.
+MODEL_WORKERS = int(os.environ.get("SUMMARIZER_WORKERS", "0"))
+THREADS_PER_WORKER = int(os.environ.get("SUMMARIZER_THREADS_PER_WORKER", "1"))
+
+# Checked once here so a split needing more cores than available fails
+# at startup; inside a request the error would be swallowed by the
+# extractive fallback and the pool rebuilt on every document.
+if MODEL_WORKERS > 0:
+    workers.plan_core_slices(MODEL_WORKERS, THREADS_PER_WORKER)
+
+MODEL_NAME = "sshleifer/distilbart-cnn-12-6"
+WORKER_GRACE_SECONDS = 5.0
+
+# Decoding profiles trade summary quality for latency. length_scale shrinks
+# each section's max/min_length; generation is passed to the pipeline.
+# "quality" keeps the checkpoint defaults (beam search, full bounds);
+# "greedy" keeps the full bounds but decodes greedily, so it can stream.
+DECODING_PROFILES = {
+    "fast": {"length_scale": 0.6, "generation": {"num_beams": 1, "do_sample": False}},
+    "greedy": {"length_scale": 1.0, "generation": {"num_beams": 1, "do_sample": False}},
+    "balanced": {"length_scale": 0.8, "generation": {"num_beams": 2, "no_repeat_ngram_size": 3}},
+    "quality": {"length_scale": 1.0, "generation": {}},
+}
+DEFAULT_PROFILE = "quality"
+
+_overload_lock = threading.Lock()
+_inflight = 0
+_recent_latency = 0.0
+_latency_recorded_at = 0.0
 
 
-# 1. COURT & CASE PATTERNS
+@st.cache_resource
+def load_summarization_model():
+    """
+    Loads and caches the DistilBART summarization model.
+    Uses Streamlit caching to avoid repeated loading.
+    """
+    return pipeline("summarization", model=MODEL_NAME)
 
 
-COURT_PATTERNS = [
-    # Supreme Court
-    r"IN THE (SUPREME COURT OF INDIA)",
-    r"(SUPREME COURT OF INDIA)",
-    r"BEFORE THE (SUPREME COURT OF INDIA)",
-    
-    # High Courts - Generic
-    r"IN THE (HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
-    r"IN THE (HIGH COURT OF [A-Z\s]+)",
-    r"(HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
-    r"(HIGH COURT OF [A-Z\s]+)",
-    r"BEFORE THE (HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+)",
-    
-    # Major High Courts
-    r"(DELHI HIGH COURT)",
-    r"(BOMBAY HIGH COURT)",
-    r"(CALCUTTA HIGH COURT)",
-    r"(MADRAS HIGH COURT)",
-    r"(KARNATAKA HIGH COURT)",
-    r"(KERALA HIGH COURT)",
-    r"(GUJARAT HIGH COURT)",
-    r"(ALLAHABAD HIGH COURT)",
-    r"(PUNJAB AND HARYANA HIGH COURT)",
-    r"(RAJASTHAN HIGH COURT)",
-    r"(MADHYA PRADESH HIGH COURT)",
-    r"(ANDHRA PRADESH HIGH COURT)",
-    r"(TELANGANA HIGH COURT)",
-    r"(ORISSA HIGH COURT)",
-    r"(PATNA HIGH COURT)",
-    r"(CHHATTISGARH HIGH COURT)",
-    r"(JHARKHAND HIGH COURT)",
-    r"(UTTARAKHAND HIGH COURT)",
-    r"(HIMACHAL PRADESH HIGH COURT)",
-    r"(JAMMU AND KASHMIR HIGH COURT)",
-    r"(GAUHATI HIGH COURT)",
-    r"(GUWAHATI HIGH COURT)",
-    
-    # Lower Courts
-    r"(DISTRICT COURT OF [A-Z\s]+)",
-    r"(DISTRICT COURT[,\s]+[A-Z\s]+)",
-    r"IN THE COURT OF (DISTRICT JUDGE[,\s]+[A-Z\s]+)",
-    r"(DISTRICT & SESSIONS COURT[,\s]+[A-Z\s]+)",
-    r"(SESSIONS COURT[,\s]+[A-Z\s]+)",
-    r"(SESSIONS COURT AT [A-Z\s]+)",
-    r"(COURT OF SESSIONS JUDGE[,\s]+[A-Z\s]+)",
-    r"(ADDITIONAL SESSIONS JUDGE[,\s]+[A-Z\s]+)",
-    
-    # Special Courts
-    r"(SPECIAL COURT FOR [A-Z\s]+)",
-    r"(CBI COURT[,\s]+[A-Z\s]+)",
-    r"(FAMILY COURT[,\s]+[A-Z\s]+)",
-    
-    # Tribunals
-    r"(NATIONAL GREEN TRIBUNAL)",
-    r"(ARMED FORCES TRIBUNAL)",
-    r"(CENTRAL ADMINISTRATIVE TRIBUNAL)",
-]
-
-CASE_NO_PATTERNS = [
-    # Writ Petitions
-    r"W\.?\s*P\.?\s*\(?(C|CR|Civil|Criminal|Crl\.?)\)?\s*(?:D\s+)?No\.?\s*\d+\s*(?:/|of)\s*\d{4}",
-    r"WP\s*\(C\)\s*No\.?\s*\d+/\d{4}",
-    r"WRIT PETITION\s*\((?:CIVIL|CRIMINAL)\)\s*NO\.?\s*\d+/\d{4}",
-    r"Writ Petition Misc\.\s+Single No\.\s*\d+\s+of\s+\d{4}",
-    r"WRIT\s+PETITION\s+\(CIVIL\)\s+NO\.\d+\s+OF\s+\d{4}",
-    r"WRIT\s+PETITION\s+\(CRIMINAL\)\s+D\s+NO\.\d+\s+OF\s+\d{4}",
-    # Appeals
-    r"(?:Civil|Criminal)\s+Appeal\s*(?:No\.?)?\s*\d+\s*(?:/|of)\s*\d{4}",
-    r"R/CRIMINAL APPEAL\s*\(AGAINST CONVICTION\)\s*NO\.\s*\d+\s+of\s+\d{4}",
-    r"Criminal Appeal No\.\s*\d+\s+of\s+\d{4}",
-    r"\bWRIT\s+PETITION\s*\(\s*(?:CIVIL|CRIMINAL)\s*\)\s*NO\.?\s*\d+\s*OF\s*\d{4}\b",
-    r"\bWRIT\s+PETITION\s*\(\s*(?:CIVIL|CRIMINAL)\s*\)\s*D\s*NO\.?\s*\d+\s*OF\s*\d{4}\b",
-    r"\b(?:CIVIL|CRIMINAL)\s+APPEAL\s+NO\.?\s*\d+\s*OF\s*\d{4}\b",
-    r"\b(?:CIVIL|CRIMINAL)\s+APPEAL\s+NOS?\.?\s*\d+(?:\s*[-–]\s*\d+)?\s*OF\s*\d{2}\s*\d{2}\b",
-    r"\bAPPEAL\s*(?:\(\s*CRL\.?\s*\))?\s*\d+\s*of\s*\d{4}\b",
-    # Special Leave
-    r"SLP\s*\(?(?:Civil|Crl\.?|Criminal|C|Crl)\)?\s*No\.?\s*\d+\s*(?:/|of)\s*\d{4}",
-    r"SPECIAL LEAVE PETITION\s*\((?:CIVIL|CRIMINAL)\)\s*NO\.?\s*\d+/\d{4}",
-    
-    # Generic Case Numbers
-    r"Case No\.\s*\d+\s+of\s+\d{4}",
-    r"\b(?:CRLA|CRA|CWP|RSA|FAO|LPA|WA|CMP|COCP|MAT|WPC)\s*No\.?\s*\d+/\d{4}",
-    
-    # CNR Numbers
-    r"\b\d{4}\s+IN[SHD]C\s+\d+\b",
-    r"\b[A-Z0-9]{16}\b",
+@st.cache_resource
+def load_worker_pool():
+    """
+    Starts and caches the sharded model worker pool when SUMMARIZER_WORKERS
+    is set. Returns None for in-process summarization.
+    """
+    if MODEL_WORKERS <= 0:
+        return None
     
-    # Fallback
-    r"No\.?\s*\d+\s*(?:of|/)\s*\d{4}",
-]
+    pool = workers.ShardedSummarizer(MODEL_WORKERS, THREADS_PER_WORKER, MODEL_NAME)
+    pool.warm_up()
+    return pool
 
-# 2. TEXT CLEANING & PREPROCESSING
 
-def clean_legal_text(raw_text):
+def get_section_spans(cleaned_text):
     """
-    Removes common PDF artifacts and noise from legal documents.
-    Returns cleaned text ready for NLP processing.
+    Character windows and token bounds for each summary section.
+    Returns {section_key: (start, end, max_length, min_length)}.
     """
-    if not raw_text or len(raw_text) < 10:
-        return raw_text
-    
-    text = raw_text
-    
-    # Remove page markers
-    text = re.sub(r'\bPage\s+\d+(?:\s+of\s+\d+)?\b', '', text, flags=re.I)
-    text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.M)
-    
-    # Remove download artifacts
-    text = re.sub(r'https?://[^\s]+', '', text)
-    text = re.sub(r'Downloaded from[^\n]+', '', text, flags=re.I)
-    
-    # Remove legal citations
-    text = re.sub(r'\[\d+\]', '', text)
-    text = re.sub(r'\(\d{4}\)', '', text)
-    text = re.sub(r'\b(?:AIR|SCC|SCR)\s+\d{4}\s+\w+\s+\d+', '', text)
-    
-    # Detect and remove repeated lines (headers/footers)
-    lines = text.split('\n')
-    line_frequency = Counter([line.strip() for line in lines if len(line.strip()) > 10])
-    repeated_lines = {line for line, count in line_frequency.items() if count >= 3}
-    
-    filtered_lines = [line for line in lines if line.strip() not in repeated_lines]
-    text = '\n'.join(filtered_lines)
-    
-    # Remove very short lines (likely artifacts)
-    lines = [line for line in text.split('\n') if len(line.strip()) > 2]
-    text = '\n'.join(lines)
-    
-    # Normalize spacing
-    text = re.sub(r' +', ' ', text)
-    text = re.sub(r'\n\n+', '\n\n', text)
-    
-    return text.strip()
+    text_length = len(cleaned_text)
+
+    petition_start = cleaned_text.lower().find("this petition")
+    if petition_start == -1:
+        petition_start = 0
+
+    middle_section = text_length // 3
+
+    return {
+        "exec_summary": (0, 3200, 180, 100),
+        "background": (petition_start, petition_start + 3000, 250, 120),
+        "issues": (1000, 4000, 130, 60),
+        "observations": (middle_section, middle_section + 3000, 200, 80),
+        "decision": (max(0, text_length - 3000), text_length, 120, 50),
+    }
 
-# 3. PARTY NAME NORMALIZATION
 
-def normalize_party_name(raw_party_text):
+def resolve_section_profiles(profile=DEFAULT_PROFILE, section_profiles=None):
     """
-    Extracts clean party names from text blocks containing addresses,
-    personal details, and legal markers.
+    Decoding profile for every section: the request-wide profile,
+    overridden per section by section_profiles.
     """
-    lines = raw_party_text.split('\n')
-    extracted_names = []
-    
-    # Common markers that indicate address/personal details start
-    address_markers = [
-        "s/o", "d/o", "w/o", "aged", "r/o", "resident", 
-        "village", "dist", "pin", "po-", "ps-",
-        "advocate", "counsel", "through", "represented by"
-    ]
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Skip empty or very short lines
-        if not line or len(line) < 3:
-            continue
-        
-        # Check if line contains address markers
-        line_lower = line.lower()
-        has_address_marker = any(marker in line_lower for marker in address_markers)
-        
-        if has_address_marker:
-            # Extract name before the marker
-            for marker in address_markers:
-                if marker in line_lower:
-                    name_before_marker = line.split(marker, 1)[0].strip()
-                    name_before_marker = re.sub(r'[,\.\-]+$', '', name_before_marker)
-                    if len(name_before_marker) > 3:
-                        extracted_names.append(name_before_marker)
-                    break
-            break  # Stop after finding address details
-        
-        # Remove common trailing labels
-        line = re.sub(
-            r"\.{3,}|\b\d+\.|\b(Petitioner|Respondent|Appellant|Accused|Applicant)\b.*", 
-            "", 
-            line, 
-            flags=re.I
-        ).strip()
-        
-        if line and len(line) > 2:
-            extracted_names.append(line)
-            
-            # Usually 1-2 lines is sufficient for a name
-            if len(extracted_names) >= 2:
-                break
+    resolved = {key: profile for key in FALLBACK_SUMMARIES}
+    resolved.update(section_profiles or {})
     
-    # Return formatted result
-    if not extracted_names:
-        return "Party Details Not Found"
+    for key, name in resolved.items():
+        if key not in FALLBACK_SUMMARIES:
+            raise ValueError(f"Unknown summary section: {key}")
+        if name not in DECODING_PROFILES:
+            raise ValueError(f"Unknown decoding profile: {name}")
     
-    result = " ".join(extracted_names[:2])
-    if len(extracted_names) > 2:
-        result += " & Ors"
-    
-    return result
-
+    return resolved
 
-# 4. ADVANCED PARTY EXTRACTION ENGINE
 
-def extract_parties_advanced(document_text):
+def build_section_requests(cleaned_text, section_spans, section_profiles):
     """
-    Multi-strategy party extraction system.
-    Handles various Indian legal document formats.
+    Model inputs for each section with its decoding profile applied.
+    Returns {section_key: (text, max_length, min_length, generation_kwargs)}.
     """
-    if not document_text:
-        return None
-    
-    # Normalize whitespace
-    document_text = re.sub(r'\s+', ' ', document_text)
-    header_section = document_text[:30000]
-    
-    # Remove common noise patterns
-    header_section = re.sub(
-        r'Approved\s+for\s+Reporting\s+(?:Yes|No|YesNo)', 
-        '', 
-        header_section, 
-        flags=re.I
-    )
-    
-    petitioner = None
-    respondent = None
-    
-    # ========== STRATEGY 1: Multi-word Authority Format ==========
-    # Pattern: "Authority Name\nPetitioner\nVersus\nRespondent Name\nRespondents"
-    # Common in PIL cases and institutional petitions
-    
-    authority_pattern = re.search(
-        r'([A-Z][A-Za-z\s&\.,()-]{10,150}?)\s+Petitioner\s+Versus\s+([A-Z][A-Za-z\s&\.,()-]{10,150}?)\s+Respondents?',
-        header_section,
-        re.IGNORECASE
-    )
-    
-    if authority_pattern:
-        petitioner = authority_pattern.group(1).strip()
-        respondent = authority_pattern.group(2).strip()
-        
-        # Normalize "and others" variations
-        petitioner = re.sub(r'\s*(?:and|&)\s*(?:others?|ors?\.?)', ' & Ors', petitioner, flags=re.I)
-        respondent = re.sub(r'\s*(?:and|&)\s*(?:others?|ors?\.?)', ' & Ors', respondent, flags=re.I)
-        
-        return f"{petitioner}\n-vs-\n{respondent}"
-    
-    # ========== STRATEGY 2: Labeled Colon Format ==========
-    # Pattern: "PETITIONER:\nName\nVs.\nRESPONDENT:\nName"
-    
-    colon_pattern = re.search(
-        r'PETITIONER\s*:\s*(?:\d+\.\s*)?([A-Z][A-Za-z\s&\.,()-]+?)\s+Vs\.\s+RESPONDENT\s*:\s*([A-Z][A-Za-z\s&\.,()-]+)',
-        header_section,
-        re.IGNORECASE | re.DOTALL
-    )
-    
-    if colon_pattern:
-        petitioner = colon_pattern.group(1).strip()
-        respondent = colon_pattern.group(2).strip()
-        
-        # Remove parenthetical content
-        petitioner = re.sub(r'\s*\(.*?\)', '', petitioner)
-        respondent = re.sub(r'\s*\(.*?\)', '', respondent)
-        
-        return f"{petitioner}\n-vs-\n{respondent}"
-    
-    # ========== STRATEGY 3: Company/Organization Format ==========
-    # Pattern: "M/s Company Name ... Petitioner"
-    
-    company_pattern = re.search(
-        r'(M/s\s+[A-Za-z\s,\.]+?)(?:\s*--?\s*Petitioner|\s+Versus)',
-        header_section,
-        re.IGNORECASE
-    )
-    
-    if company_pattern:
-        petitioner = company_pattern.group(1).strip()
-        petitioner = re.sub(r'\s*,.*$', '', petitioner)  # Remove address after comma
-        
-        # Find respondent after Versus
-        versus_position = header_section[company_pattern.end():]
-        respondent_match = re.search(
-            r'Versus\s+([A-Z][A-Za-z\s,\.&]+?)(?:\s*--?\s*Respondent|\s+With)',
-            versus_position,
-            re.IGNORECASE
+    requests = {}
+    
+    for key, (start, end, max_length, min_length) in section_spans.items():
+        profile = DECODING_PROFILES[section_profiles[key]]
+        scale = profile["length_scale"]
+        requests[key] = (
+            cleaned_text[start:end],
+            max(int(max_length * scale), 1),
+            max(int(min_length * scale), 1),
+            profile["generation"],
         )
-        
-        if respondent_match:
-            respondent = respondent_match.group(1).strip()
-            respondent = re.sub(r'\s*,.*$', '', respondent)
-            return f"{petitioner}\n-vs-\n{respondent}"
-    
-    # ========== STRATEGY 4: All-Caps With Dots Format ==========
-    # Pattern: "NAME ... PETITIONER\nVERSUS\nNAME ... RESPONDENT"
-    
-    caps_dots_pattern = re.search(
-        r'([A-Z][A-Z\s]+[A-Z])\s+\.{3,}\s*PETITIONER\s+VERSUS\s+([A-Z][A-Z\s]+[A-Z])\s+\.{3,}\s*RESPONDENT',
-        header_section,
-        re.IGNORECASE
-    )
-    
-    if caps_dots_pattern:
-        petitioner = caps_dots_pattern.group(1).strip()
-        respondent = caps_dots_pattern.group(2).strip()
-        
-        # Convert to title case for readability
-        petitioner = ' '.join(word.capitalize() for word in petitioner.split())
-        respondent = ' '.join(word.capitalize() for word in respondent.split())
-        
-        return f"{petitioner}\n-vs-\n{respondent}"
-    
-    # ========== STRATEGY 5: Title With Address Format ==========
-    # Pattern: "Smt./Shri Name, address details ... Petitioner"
-    
-    title_pattern = re.search(
-        r'((?:Smt\.|Shri|Sri|Dr\.|M/s|Mr\.|Mrs\.|Ms\.)\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-        header_section,
-        re.IGNORECASE
-    )
     
-    if title_pattern:
-        petitioner = title_pattern.group(1).strip()
-        
-        # Find Versus marker after petitioner
-        versus_marker = re.search(
-            r'(?:VERSUS|Versus|V/S|VS)', 
-            header_section[title_pattern.end():], 
-            re.I
-        )
-        
-        if versus_marker:
-            after_versus = header_section[title_pattern.end() + versus_marker.end():]
-            
-            # Look for State/Union pattern
-            government_pattern = re.search(
-                r'(?:1\.\s*)?(?:The\s+)?((?:State|Union)\s+of\s+[A-Z][a-z]+)',
-                after_versus[:500],
-                re.IGNORECASE
+    return requests
+
+
+def summarize_section(text, max_length, min_length, generation_kwargs):
+    """
+    One in-process model call for a single section.
+    """
+    summarizer = load_summarization_model()
+    return summarizer(
+        text,
+        max_length=max_length,
+        min_length=min_length,
+        truncation=True,
+        **generation_kwargs
+    )[0]['summary_text']
+
+
+class _StopWhenSet(StoppingCriteria):
+    """
+    Ends generation once the event is set.
+    """
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return input_ids.new_full((input_ids.shape[0],), self.event.is_set()).bool()
+
+
+def stream_section(text, max_length, min_length, generation_kwargs):
+    """
+    Yields the summary of one section as decoded text chunks.
+    Beam search cannot stream, so beam profiles yield the finished
+    summary in one chunk.
+    """
+    summarizer = load_summarization_model()
+    num_beams = generation_kwargs.get("num_beams", summarizer.model.generation_config.num_beams or 1)
+    
+    if num_beams > 1:
+        yield summarize_section(text, max_length, min_length, generation_kwargs)
+        return
+    
+    tokenizer = summarizer.tokenizer
+    inputs = tokenizer(text, truncation=True, return_tensors="pt").to(summarizer.model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+    stop_generation = threading.Event()
+    generation_errors = []
+    
+    def run_generation():
+        try:
+            summarizer.model.generate(
+                **inputs,
+                max_length=max_length,
+                min_length=min_length,
+                streamer=streamer,
+                stopping_criteria=StoppingCriteriaList([_StopWhenSet(stop_generation)]),
+                **generation_kwargs
             )
-            
-            if government_pattern:
-                respondent = government_pattern.group(1)
-                return f"{petitioner}\n-vs-\n{respondent}"
+        except Exception as generation_error:
+            # Unblock the consumer instead of leaving it waiting on the streamer
+            generation_errors.append(generation_error)
+            streamer.end()
     
-    # ========== STRATEGY 6: Standard Versus Split ==========
-    # Pattern: "Name VERSUS Name"
+    generation_thread = threading.Thread(target=run_generation, daemon=True)
+    generation_thread.start()
     
-    versus_split = re.search(
-        r'([A-Z][A-Za-z\s\.]{5,80}?)\s+(?:VERSUS|versus|Versus|V/S|v/s|VS|vs\.?)\s+([A-Z][A-Za-z\s\.&]{5,80})',
-        header_section[:5000]
-    )
-    
-    if versus_split:
-        petitioner = versus_split.group(1).strip()
-        respondent = versus_split.group(2).strip()
-        
-        # Remove date references
-        petitioner = re.sub(r'\s*on\s+\d+.*$', '', petitioner, flags=re.I)
-        respondent = re.sub(r'\s*on\s+\d+.*$', '', respondent, flags=re.I)
-        
-        # Filter out court names and noise
-        noise_keywords = [
-            'SUPREME COURT', 'HIGH COURT', 'SESSIONS', 'COURT OF',
-            'Approved', 'Reporting', 'YesNo', 'Appearance'
-        ]
-        
-        if not any(keyword in petitioner for keyword in noise_keywords):
-            return f"{petitioner}\n-vs-\n{respondent}"
+    try:
+        for chunk in streamer:
+            yield chunk
+    finally:
+        # A consumer that stops reading early (a discarded job) stops decoding
+        stop_generation.set()
     
-    return "Parties Not Detected"
+    generation_thread.join()
+    if generation_errors:
+        raise generation_errors[0]
 
 
-def extract_parties(document_text):
+def _record_latency(seconds):
     """
-    Main party extraction function with fallback logic.
-    Tries advanced strategies first, then falls back to original logic.
+    Updates the moving average of abstractive latency per document.
     """
-    header = document_text[:6000].replace('\r', '')
-    header = re.split(r"\n\s*WITH\s*\n", header, flags=re.I)[0]
+    global _recent_latency, _latency_recorded_at
 
-    # Try advanced extraction first
-    advanced_result = extract_parties_advanced(document_text)
-    if advanced_result and advanced_result != "Parties Not Detected":
-        return advanced_result
+    with _overload_lock:
+        if _latency_recorded_at == 0.0:
+            _recent_latency = seconds
+        else:
+            _recent_latency = 0.7 * _recent_latency + 0.3 * seconds
+        _latency_recorded_at = time.monotonic()
 
-    # Fallback Strategy 1: Anchor Block Match
-    anchor_pattern = r"(?:No\.?|Petition|Appeal|SLP|CRL\.A)(?:[\s\S]+?\d{4})?([\s\S]+?)\s+(?:VERSUS|V/S|VS\.?)\s+([\s\S]+?)(?=\n\s*(?:ORDER|JUDGMENT|BEFORE|JUSTICE|CORAM|DATED|PRESENT))"
-    match = re.search(anchor_pattern, header, re.I)
-    
-    if match:
-        petitioner = normalize_party_name(match.group(1))
-        respondent = normalize_party_name(match.group(2))
-        
-        if "Court" not in petitioner and len(petitioner) > 2:
-            return f"{petitioner}\n-vs-\n{respondent}"
-
-    # Fallback Strategy 2: Positional Split
-    versus_markers = [r"\n\s*VERSUS\s*\n", r"\n\s*V/S\s*\n", r"\n\s*VS\.?\s*\n"]
+
+def is_overloaded():
+    """
+    True when the abstractive model should be bypassed: too many documents
+    are already being summarized, or recent documents took longer than the
+    latency budget. Latency readings expire so the model gets probed again.
+    """
+    with _overload_lock:
+        if MAX_INFLIGHT_SUMMARIES and _inflight >= MAX_INFLIGHT_SUMMARIES:
+            return True
+
+        latency_is_fresh = time.monotonic() - _latency_recorded_at < LATENCY_WINDOW_SECONDS
+        if LATENCY_BUDGET_SECONDS and latency_is_fresh:
+            return _recent_latency > LATENCY_BUDGET_SECONDS
+
+    return False
+
+
+def _time_limited(key, request, deadline):
+    """
+    Adds the section's remaining budget as generation max_time.
+    Returns None, recording the timeout, when no time is left.
+    """
+    if deadline is None:
+        return request
+
+    budget = deadline.budget("summary")
+    if budget <= 0:
+        deadline.record_timeout(f"summary:{key}")
+        return None
+
+    text, max_length, min_length, generation_kwargs = request
+    return text, max_length, min_length, {**generation_kwargs, "max_time": budget}
+
+
+def _record_overrun(key, request, generation_seconds, deadline):
+    # Generation that used its whole max_time was cut short
+    if deadline is not None and generation_seconds >= request[3]["max_time"]:
+        deadline.record_timeout(f"summary:{key}")
+
+
+def _fill_missing_sections(summaries, cleaned_text, section_spans):
+    """
+    Extractive summaries for sections skipped by the deadline.
+    """
+    missing = {key: span for key, span in section_spans.items() if key not in summaries}
+    if not missing:
+        return {}
+
+    try:
+        return extractive.summarize_sections(cleaned_text, missing)
+    except Exception as processing_error:
+        return {key: FALLBACK_SUMMARIES[key] for key in missing}
+
+
+def generate_abstractive_summaries(cleaned_text, section_spans, section_profiles, deadline=None):
+    """
+    Runs DistilBART over each section window, in the worker pool
+    when sharding is enabled. Each section is bounded by the deadline's
+    summary budget; skipped sections are filled extractively.
+    Raises on model failure so callers can fall back.
+    """
+    global _inflight
+
+    with _overload_lock:
+        _inflight += 1
+    started = time.perf_counter()
+
+    section_requests = build_section_requests(cleaned_text, section_spans, section_profiles)
+    summaries = {}
+
+    try:
+        worker_pool = load_worker_pool()
+        if worker_pool is not None:
+            limited = {}
+            for key, request in section_requests.items():
+                request = _time_limited(key, request, deadline)
+                if request is not None:
+                    limited[key] = request
+
+            summaries.update(_pooled_summaries(worker_pool, limited, deadline))
+        else:
+            for key, request in section_requests.items():
+                request = _time_limited(key, request, deadline)
+                if request is None:
+                    continue
+                section_started = time.monotonic()
+                summaries[key] = summarize_section(*request)
+                _record_overrun(key, request, time.monotonic() - section_started, deadline)
+    finally:
+        with _overload_lock:
+            _inflight -= 1
+
+    _record_latency(time.perf_counter() - started)
+    summaries.update(_fill_missing_sections(summaries, cleaned_text, section_spans))
+    return summaries
+
+
+def stream_abstractive_summaries(cleaned_text, section_spans, section_profiles, deadline=None):
+    """
+    Streaming counterpart of generate_abstractive_summaries.
+    Yields (section_key, text_so_far) as each section is decoded; with
+    sharding enabled, each section arrives whole once its worker finishes.
+    """
+    global _inflight
+
+    with _overload_lock:
+        _inflight += 1
+    started = time.perf_counter()
+
+    section_requests = build_section_requests(cleaned_text, section_spans, section_profiles)
+    summaries = {}
+
+    try:
+        worker_pool = load_worker_pool()
+        if worker_pool is not None:
+            limited = {}
+            for key, request in section_requests.items():
+                request = _time_limited(key, request, deadline)
+                if request is not None:
+                    limited[key] = request
+
+            for key, summary in _pooled_summaries(worker_pool, limited, deadline):
+                summaries[key] = summary
+                yield key, summary
+        else:
+            for key, request in section_requests.items():
+                request = _time_limited(key, request, deadline)
+                if request is None:
+                    continue
+                section_started = time.monotonic()
+                text_so_far = ""
+                for chunk in stream_section(*request):
+                    text_so_far += chunk
+                    yield key, text_so_far
+                summaries[key] = text_so_far.strip()
+                _record_overrun(key, request, time.monotonic() - section_started, deadline)
+                yield key, summaries[key]
+    finally:
+        with _overload_lock:
+            _inflight -= 1
+
+    _record_latency(time.perf_counter() - started)
+    for key, summary in _fill_missing_sections(summaries, cleaned_text, section_spans).items():
+        yield key, summary
+
+
+def _pooled_summaries(worker_pool, section_requests, deadline):
+    """
+    Yields (section_key, summary) from the worker pool in submission order.
+    Waiting is bounded by the document deadline rather than per section,
+    since sections may queue behind other documents' sections; sections
+    still queued when it expires, or when the generator is closed, are
+    cancelled.
+    """
+    futures = worker_pool.submit_sections(section_requests)
+    # Worker results get a short grace period past the deadline
+    wait_until = None if deadline is None else time.monotonic() + deadline.remaining() + WORKER_GRACE_SECONDS
     
-    for marker in versus_markers:
-        split_result = re.split(marker, header, maxsplit=1, flags=re.I)
-        
-        if len(split_result) == 2:
-            # Get last 4 lines before VERSUS
-            before_lines = [l for l in split_result[0].strip().split('\n') if len(l.strip()) > 2][-4:]
-            # Get first 4 lines after VERSUS
-            after_lines = [l for l in split_result[1].strip().split('\n') if len(l.strip()) > 2][:4]
-            
-            petitioner_text = "\n".join(before_lines)
-            respondent_text = "\n".join(after_lines)
-            
-            petitioner = normalize_party_name(petitioner_text)
-            respondent = normalize_party_name(respondent_text)
-            
-            if len(petitioner) > 3:
-                return f"{petitioner}\n-vs-\n{respondent}"
-
-    return "Parties Not Detected"
-
-
-# 5. NLP MODEL INITIALIZATION
+    try:
+        for key, future in futures.items():
+            timeout = None if wait_until is None else max(wait_until - time.monotonic(), 0.0)
+            try:
+                summary, generation_seconds = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                deadline.record_timeout(f"summary:{key}")
+                continue
+            _record_overrun(key, section_requests[key], generation_seconds, deadline)
+            yield key, summary
+    finally:
+        # Frees worker slots when the consumer stops reading early
+        for future in futures.values():
+            future.cancel()
+
+
+def _extractive_or_fallback(cleaned_text, section_spans):
+    try:
+        return extractive.summarize_sections(cleaned_text, section_spans), "extractive"
+    except Exception as processing_error:
+        return dict(FALLBACK_SUMMARIES), "fallback"
 
 
-@st.cache_resource
-def load_summarization_model():
+def _generate_summaries(cleaned_text, section_spans, engine, section_profiles, deadline=None):
     """
-    Loads and caches the DistilBART summarization model.
-    Uses Streamlit caching to avoid repeated loading.
+    Summaries from the requested engine, degrading from the model to the
+    extractive engine to static messages on failure.
+    Returns (summaries, summary_engine).
     """
-    return pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+    if engine == "abstractive":
+        try:
+            summaries = generate_abstractive_summaries(cleaned_text, section_spans, section_profiles, deadline)
+            return summaries, "abstractive"
+        except Exception as processing_error:
+            pass
 
+    return _extractive_or_fallback(cleaned_text, section_spans)
 
-# 6. MAIN DOCUMENT ANALYSIS ENGINE
+
+# 2. MAIN DOCUMENT ANALYSIS ENGINE
+
+
+class _CacheMiss(Exception):
+    pass
 
 
 @st.cache_data
-def get_summarized_data(raw_document_text):
+def _cached_analysis(raw_document_text, summary_engine, section_profiles, _result=None):
+    """
+    Finished analyses keyed by document, the engine that produced the
+    summaries and the per-section decoding profiles. Called without
+    _result it is a lookup that raises _CacheMiss; called with _result
+    on a miss it stores that result.
+    """
+    if _result is None:
+        # Exceptions are not cached, so a miss leaves the cache untouched
+        raise _CacheMiss()
+    return _result
+
+
+def _lookup_analysis(raw_document_text, engine, section_profiles):
+    try:
+        return _cached_analysis(raw_document_text, engine, section_profiles)
+    except _CacheMiss:
+        return None
+
+
+def _store_analysis(raw_document_text, section_profiles, analysis_result):
+    """
+    Caches a result under the engine that actually produced it, so an
+    abstractive request served extractively after a model error is
+    retried next time. Static fallback summaries and degraded results
+    are never cached: timeouts are often caused by load, not by the
+    document, and deserve a retry.
+    """
+    summary_engine = analysis_result["summary_engine"]
+    if summary_engine in SUMMARY_ENGINES and not analysis_result["degraded"]:
+        _cached_analysis(raw_document_text, summary_engine, section_profiles, _result=analysis_result)
+
+
+def _resolve_request(engine, profile, section_profiles):
+    """
+    Validates request options.
+    Returns (engine, section_profiles) in the form used as cache key.
+    """
+    if engine not in SUMMARY_ENGINES:
+        raise ValueError(f"Unknown summary engine: {engine}")
+
+    resolved_profiles = resolve_section_profiles(profile, section_profiles)
+    return engine, tuple(sorted(resolved_profiles.items()))
+
+
+def _find_cached(raw_document_text, engine, section_profiles, shed_load):
+    """
+    Cached result for the request, checked before overload shedding so
+    cached abstractive results are still served while overloaded.
+    Returns (cached_result or None, engine to run on a miss).
+    """
+    cached = _lookup_analysis(raw_document_text, engine, section_profiles)
+    if cached is None and shed_load and engine == "abstractive" and is_overloaded():
+        engine = "extractive"
+        cached = _lookup_analysis(raw_document_text, engine, section_profiles)
+    return cached, engine
+
+
+def get_summarized_data(raw_document_text, engine="abstractive", profile=DEFAULT_PROFILE, section_profiles=None, deadline=None, shed_load=True):
     """
     Primary analysis function that orchestrates all document processing.
+    engine selects "abstractive" (DistilBART) or "extractive" summaries;
+    abstractive requests are served extractively while overloaded unless
+    shed_load is False.
+    profile names the decoding profile, section_profiles overrides it
+    per section, e.g. {"decision": "quality"}.
+    deadline is a watchdog.Deadline; a default one is used if omitted.
     Returns comprehensive metadata and summaries.
     """
-    
-    # Step 1: Clean the document
-    cleaned_text = clean_legal_text(raw_document_text)
-    
-    # Load summarization model
-    summarizer = load_summarization_model()
-    
-    # Prepare text sections for analysis
-    safe_summary_text = cleaned_text[:3200]
-    header_section = cleaned_text[:5000].replace('\r', '')
+    engine, section_profiles = _resolve_request(engine, profile, section_profiles)
+    cached, engine = _find_cached(raw_document_text, engine, section_profiles, shed_load)
+    if cached is not None:
+        return cached
 
-    # ========== EXTRACT COURT NAME ==========
-    court_name = "COURT NOT DETECTED"
-    
-    for pattern in COURT_PATTERNS:
-        court_match = re.search(pattern, header_section, re.I)
-        if court_match:
-            court_name = court_match.group(0).upper()
-            # Clean up prefixes
-            court_name = re.sub(r'^(?:IN THE|BEFORE THE|THE)\s+', '', court_name)
-            court_name = re.sub(r"HON'?BLE\s+", '', court_name)
-            break
-    
-    # Flexible fallback for unmatched courts
-    if court_name == "COURT NOT DETECTED":
-        flexible_court = re.search(
-            r'(HIGH COURT OF [A-Z\s]+ AT [A-Z\s]+|SESSIONS COURT AT [A-Z\s]+)',
-            header_section,
-            re.I
-        )
-        if flexible_court:
-            court_name = flexible_court.group(1).upper()
+    analysis_result = _analyze_document(raw_document_text, engine, section_profiles, deadline=deadline)
+    _store_analysis(raw_document_text, section_profiles, analysis_result)
+    return analysis_result
 
-    # ========== EXTRACT CASE NUMBER ==========
-    case_number = "N/A"
+
+def stream_summarized_data(raw_document_text, engine="abstractive", profile=DEFAULT_PROFILE, section_profiles=None, deadline=None, shed_load=True):
+    """
+    Streaming variant of get_summarized_data.
+    Yields (section_key, text_so_far) while summaries are generated, then
+    ("result", analysis_result). The result is cached under the same key
+    get_summarized_data uses, so either call reuses the other's work.
+    """
+    engine, section_profiles = _resolve_request(engine, profile, section_profiles)
+    cached, engine = _find_cached(raw_document_text, engine, section_profiles, shed_load)
+    if cached is not None:
+        yield "result", cached
+        return
+
+    deadline = deadline or watchdog.Deadline()
+    cleaned = clean_within(raw_document_text, deadline)
+    cleaned_text = cleaned[0]
+    section_spans = get_section_spans(cleaned_text)
+    summaries = {}
+    summary_engine = engine
+
+    if engine == "abstractive":
+        try:
+            for key, text_so_far in stream_abstractive_summaries(cleaned_text, section_spans, dict(section_profiles), deadline):
+                summaries[key] = text_so_far
+                yield key, text_so_far
+        except Exception as processing_error:
+            summary_engine = "extractive"
+
+    if summary_engine != "abstractive":
+        summaries, summary_engine = _extractive_or_fallback(cleaned_text, section_spans)
+        for key, summary in summaries.items():
+            yield key, summary
+
+    analysis_result = _analyze_document(
+        raw_document_text, engine, section_profiles,
+        summaries=(summaries, summary_engine), deadline=deadline, cleaned=cleaned
+    )
+    _store_analysis(raw_document_text, section_profiles, analysis_result)
+    yield "result", analysis_result
+
+
+def clean_within(raw_document_text, deadline):
+    """
+    The cleaning stage: clean_and_extract_citations within its budget,
+    falling back to the raw text.
+    """
+    return deadline.run_stage(
+        "cleaning", clean_and_extract_citations, raw_document_text,
+        fallback=(raw_document_text, build_offset_map(np.arange(len(raw_document_text), dtype=np.int64)), []),
+        isolate=True
+    )
+
+
+def _analyze_document(raw_document_text, engine, section_profiles, summaries=None, deadline=None, cleaned=None):
+    """
+    Analysis of one document with a resolved summary engine and
+    per-section decoding profiles. summaries supplies already generated
+    (summaries, summary_engine), cleaned an already computed cleaning
+    result; deadline is the watchdog.Deadline that bounds every stage.
+    Stages that overrun fall back to placeholders; the result is then
+    marked "degraded" and lists the "timeouts".
+    """
+    deadline = deadline or watchdog.Deadline()
     
-    for pattern in CASE_NO_PATTERNS:
-        case_match = re.search(pattern, header_section, re.I)
-        if case_match:
-            case_number = case_match.group(0).strip()
-            break
-
-    # ========== EXTRACT PARTIES ==========
-    parties_result = extract_parties(cleaned_text)
+    # Step 1: Clean the document
+    cleaned_text, offset_map, citations = cleaned or clean_within(raw_document_text, deadline)
     
-    # ========== DETERMINE JURISDICTION ==========
-    jurisdiction_patterns = {
-        "Writ Jurisdiction": r"(?i)(article\s+(?:226|32|227|136|142|141)|writ\s+petition|constitutional\s+remedy|writ\s+of\s+(?:habeas corpus|mandamus|prohibition|certiorari|quo warranto))",
-        "Appellate Jurisdiction": r"(?i)(civil\s+appeal|criminal\s+appeal|special\s+leave\s+petition|appellate\s+jurisdiction|regular\s+(?:first|second)\s+appeal)",
-        "Original Jurisdiction": r"(?i)(original\s+suit|civil\s+original|original\s+side|original\s+jurisdiction)",
-        "Bail Jurisdiction": r"(?i)(bail\s+application|anticipatory\s+bail|section\s+(?:438|439|437|436|167)|regular\s+bail)",
-        "Revisional Jurisdiction": r"(?i)(civil\s+revision|criminal\s+revision|revisional\s+jurisdiction|revision\s+petition)",
-        "Criminal Original Jurisdiction": r"(?i)(criminal\s+complaint|complaint\s+case|section\s+(?:138|156|200|340|482))",
-        "Contempt Jurisdiction": r"(?i)(contempt\s+of\s+court|criminal\s+contempt|civil\s+contempt)",
-        "Execution Jurisdiction": r"(?i)(execution\s+petition|execution\s+proceedings|decree\s+execution)",
-        "General Jurisdiction": r".*",
-    }
+    court_name, case_number, jurisdiction_type = deadline.run_stage(
+        "metadata", extract_metadata, cleaned_text,
+        fallback=("COURT NOT DETECTED", "N/A", "General Jurisdiction"),
+        isolate=True
+    )
     
-    jurisdiction_type = "General Jurisdiction"
+    parties_result = deadline.run_stage(
+        "parties", extract_parties, cleaned_text,
+        fallback="Parties Not Detected",
+        isolate=True
+    )
     
-    for label, pattern in jurisdiction_patterns.items():
-        if label != "General Jurisdiction" and re.search(pattern, header_section, re.I):
-            jurisdiction_type = label
-            break
-
     # ========== GENERATE NLP SUMMARIES ==========
-    try:
-        # Executive Summary
-        executive_summary = summarizer(
-            safe_summary_text, 
-            max_length=180, 
-            min_length=100, 
-            truncation=True
-        )[0]['summary_text']
-        
-        # Background Summary
-        petition_start = cleaned_text.lower().find("this petition")
-        if petition_start != -1:
-            background_text = cleaned_text[petition_start:petition_start+3000]
-        else:
-            background_text = cleaned_text[:3000]
-        
-        background_summary = summarizer(
-            background_text, 
-            max_length=250, 
-            min_length=120, 
-            truncation=True
-        )[0]['summary_text']
-
-        # Issues Summary
-        issues_summary = summarizer(
-            cleaned_text[1000:4000][:3000], 
-            max_length=130, 
-            min_length=60, 
-            truncation=True
-        )[0]['summary_text']
-        
-        # Observations Summary
-        middle_section = len(cleaned_text) // 3
-        observations_summary = summarizer(
-            cleaned_text[middle_section:middle_section + 3000], 
-            max_length=200, 
-            min_length=80, 
-            truncation=True
-        )[0]['summary_text']
-        
-        # Decision Summary
-        decision_summary = summarizer(
-            cleaned_text[-3000:], 
-            max_length=120, 
-            min_length=50, 
-            truncation=True
-        )[0]['summary_text']
-        
-    except Exception as processing_error:
-        # Graceful degradation if summarization fails
-        executive_summary = "Summarization processing encountered an error."
-        background_summary = "Unable to generate background summary."
-        issues_summary = "Unable to extract issues."
-        observations_summary = "Unable to extract observations."
-        decision_summary = "Unable to extract decision."
-
-    # ========== EXTRACT VERBATIM SENTENCES ==========
-    def extract_verbatim_sentences(keyword_list):
-        """
-        Finds and extracts complete sentences containing specified keywords.
-        Returns sentences with reference IDs for traceability.
-        """
-        extracted_sentences = []
-        
-        for keyword in keyword_list:
-            # Pattern to match complete sentences containing the keyword
-            sentence_pattern = rf"([A-Z][^.!?]*?\b{keyword}\b[^.!?]*?[.!?])"
-            
-            for match in re.finditer(sentence_pattern, cleaned_text, re.I | re.DOTALL):
-                sentence = match.group().strip()
-                
-                # Filter by length (avoid fragments and overly long matches)
-                if 30 < len(sentence) < 500:
-                    reference_id = match.start()
-                    extracted_sentences.append(f"[Ref ID: {reference_id}] {sentence}")
-        
-        # Remove duplicates while preserving order
-        unique_sentences = list(dict.fromkeys(extracted_sentences))
-        
-        return unique_sentences[:5]  # Return top 5 matches
+    if summaries is not None:
+        summaries, summary_engine = summaries
+    else:
+        section_spans = get_section_spans(cleaned_text)
+        summaries, summary_engine = _generate_summaries(
+            cleaned_text, section_spans, engine, dict(section_profiles), deadline
+        )
+    
+    source_log = deadline.run_stage(
+        "traces", extract_source_log, cleaned_text,
+        fallback={section: [] for section in TRACE_KEYWORDS},
+        isolate=True
+    )
 
     # Compile final analysis result
     analysis_result = {
@@ -598,25 +635,17 @@ def get_summarized_data(raw_document_text):
         "case_no": case_number,
         "jurisdiction": jurisdiction_type,
         "parties": parties_result,
-        "exec_summary": executive_summary,
-        "background": background_summary,
-        "issues": issues_summary,
-        "observations": observations_summary,
-        "decision": decision_summary,
-        "source_log": {
-            "Case Background Trace": extract_verbatim_sentences([
-                "fact", "background", "incident", "allegation", 
-                "accused", "victim", "petitioner", "appellant", "case"
-            ]),
-            "Court Observation Trace": extract_verbatim_sentences([
-                "observed", "held", "court", "opined", "noted", 
-                "finding", "concluded", "reasoning"
-            ]),
-            "Final Decision Trace": extract_verbatim_sentences([
-                "directed", "ordered", "dismissed", "allowed", 
-                "disposed", "decree", "judgment", "held that"
-            ])
-        }
+        "exec_summary": summaries["exec_summary"],
+        "background": summaries["background"],
+        "issues": summaries["issues"],
+        "observations": summaries["observations"],
+        "decision": summaries["decision"],
+        "summary_engine": summary_engine,
+        "offset_map": offset_map,
+        "citations": citations,
+        "source_log": source_log,
+        "degraded": deadline.degraded,
+        "timeouts": list(deadline.timeouts),
     }
     
     return analysis_result
\ No newline at end of file
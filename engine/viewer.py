@@ -0,0 +1,95 @@
+import bisect
+import re
+
+
+WINDOW_LINES = 60
+
+
+def build_line_index(text):
+    """
+    Start offset of every line in the text.
+    Built once per document; lookups afterwards are logarithmic.
+    """
+    return [0] + [match.end() for match in re.finditer(r"\n", text)]
+
+
+def line_at(line_index, offset):
+    """
+    Line number containing a character offset.
+    """
+    return max(bisect.bisect_right(line_index, offset) - 1, 0)
+
+
+def clamp_first_line(line_index, first_line, window_lines=WINDOW_LINES):
+    """
+    Keeps a window start inside the document.
+    """
+    last_start = max(len(line_index) - window_lines, 0)
+    return min(max(first_line, 0), last_start)
+
+
+def window_around(line_index, offset, window_lines=WINDOW_LINES):
+    """
+    First line of a window that shows the offset about a third of the
+    way down, leaving some context above it.
+    """
+    first_line = line_at(line_index, offset) - window_lines // 3
+    return clamp_first_line(line_index, first_line, window_lines)
+
+
+def get_window(text, line_index, first_line, window_lines=WINDOW_LINES):
+    """
+    Slice of the text covering window_lines lines from first_line.
+    Returns (window_text, window_start_offset).
+    """
+    first_line = clamp_first_line(line_index, first_line, window_lines)
+    start = line_index[first_line]
+
+    last_line = first_line + window_lines
+    end = line_index[last_line] if last_line < len(line_index) else len(text)
+
+    return text[start:end], start
+
+
+def find_matches(text, keyword):
+    """
+    Offsets of every case-insensitive occurrence of the keyword.
+    """
+    if not keyword:
+        return []
+    return [match.start() for match in re.finditer(re.escape(keyword), text, re.I)]
+
+
+def _highlight_keyword(text, keyword):
+    if not keyword:
+        return text
+    return re.sub(
+        f"({re.escape(keyword)})",
+        r'<span class="highlight">\1</span>',
+        text,
+        flags=re.I
+    )
+
+
+def highlight_window(window_text, window_start, keyword=None, span=None):
+    """
+    Wraps keyword hits and an optional (start, end) document span that
+    fall inside the window in highlight markup.
+    """
+    span_start = span_end = 0
+    if span:
+        span_start = min(max(span[0] - window_start, 0), len(window_text))
+        span_end = min(max(span[1] - window_start, 0), len(window_text))
+
+    if span_start >= span_end:
+        return _highlight_keyword(window_text, keyword)
+
+    # Highlight each segment separately so keyword markup never lands
+    # inside the span markup
+    return (
+        _highlight_keyword(window_text[:span_start], keyword)
+        + '<span class="highlight">'
+        + _highlight_keyword(window_text[span_start:span_end], keyword)
+        + '</span>'
+        + _highlight_keyword(window_text[span_end:], keyword)
+    )
@@ -0,0 +1,190 @@
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+
+
+# Whole-document deadline and per-stage budgets, in seconds. Each summary
+# section gets its own "summary" budget.
+DOCUMENT_BUDGET = float(os.environ.get("ANALYSIS_DEADLINE_SECONDS", "600"))
+
+STAGE_BUDGETS = {
+    "extraction": 120.0,
+    "cleaning": 20.0,
+    "metadata": 10.0,
+    "parties": 10.0,
+    "summary": 90.0,
+    "traces": 20.0,
+}
+
+# Regex stages cannot be interrupted inside a thread, so they run in a
+# stage worker process that is killed and replaced on overrun. Workers are
+# spawned, not forked: the parent runs torch and executor threads. When
+# disabled, stages run inline and overruns are only recorded.
+ISOLATE_STAGES = os.environ.get("ANALYSIS_ISOLATE_STAGES", "1") != "0"
+
+# Imported by each stage worker before it reports ready, so import time
+# is not charged to the first stage it runs. Stage functions must live in
+# these modules, which do not load the model stack.
+STAGE_WORKER_MODULES = ("engine.processor", "engine.legal_text")
+
+# Seconds a new stage worker may take to report ready
+STAGE_WORKER_STARTUP_SECONDS = 30.0
+
+_idle_workers = []
+_idle_lock = threading.Lock()
+
+
+class StageTimeout(Exception):
+    pass
+
+
+def _serve_stages(connection, modules):
+    for module in modules:
+        importlib.import_module(module)
+    connection.send("ready")
+
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, function(*args)))
+        except Exception as stage_error:
+            connection.send((False, stage_error))
+
+
+class StageWorker:
+    """
+    Spawned process that runs isolated stages one at a time.
+    """
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve_stages,
+            args=(child_connection, STAGE_WORKER_MODULES),
+            daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._ready = False
+
+    def run(self, function, args, timeout):
+        """
+        Runs function(*args) and returns (succeeded, result or exception).
+        Raises StageTimeout if it overruns the timeout, which is counted
+        from when the worker is ready, or if the worker does not become
+        ready within STAGE_WORKER_STARTUP_SECONDS.
+        """
+        name = getattr(function, "__name__", function)
+
+        try:
+            if not self._ready:
+                if not self._connection.poll(STAGE_WORKER_STARTUP_SECONDS):
+                    raise StageTimeout(f"stage worker not ready after {STAGE_WORKER_STARTUP_SECONDS:.1f}s")
+                self._connection.recv()
+                self._ready = True
+            self._connection.send((function, args))
+
+            if not self._connection.poll(timeout):
+                raise StageTimeout(f"{name} exceeded {timeout:.1f}s")
+            return self._connection.recv()
+        except (EOFError, OSError):
+            raise RuntimeError(f"{name} worker exited unexpectedly")
+
+    def kill(self):
+        self._process.kill()
+        self._process.join()
+        self._connection.close()
+
+
+def _acquire_worker():
+    with _idle_lock:
+        if _idle_workers:
+            return _idle_workers.pop()
+    return StageWorker()
+
+
+def _release_worker(worker):
+    with _idle_lock:
+        _idle_workers.append(worker)
+
+
+def run_isolated(function, args, timeout):
+    """
+    Runs function(*args) in a stage worker and returns its result.
+    A worker that overruns the timeout or dies is killed and replaced;
+    StageTimeout is raised on overrun.
+    """
+    worker = _acquire_worker()
+
+    try:
+        succeeded, value = worker.run(function, args, timeout)
+    except BaseException:
+        worker.kill()
+        # The replacement starts loading now, not when the next stage needs it
+        _release_worker(StageWorker())
+        raise
+
+    _release_worker(worker)
+    if not succeeded:
+        raise value
+    return value
+
+
+class Deadline:
+    """
+    Time budget for one document, carried through every analysis stage.
+    Stages that overrun are skipped or cut short and recorded, so the
+    result can be marked as degraded.
+    """
+
+    def __init__(self, total_seconds=None, stage_budgets=None):
+        self.expires_at = time.monotonic() + (total_seconds or DOCUMENT_BUDGET)
+        self.stage_budgets = {**STAGE_BUDGETS, **(stage_budgets or {})}
+        self.timeouts = []
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def budget(self, stage):
+        """
+        Seconds the stage may use: its own budget, capped by what is
+        left of the document deadline.
+        """
+        return min(self.stage_budgets[stage], self.remaining())
+
+    def record_timeout(self, stage):
+        if stage not in self.timeouts:
+            self.timeouts.append(stage)
+
+    @property
+    def degraded(self):
+        return bool(self.timeouts)
+
+    def run_stage(self, stage, function, *args, fallback=None, isolate=False):
+        """
+        Runs one stage within its budget.
+        Returns fallback if the stage had no time left or was killed.
+        """
+        budget = self.budget(stage)
+        if budget <= 0:
+            self.record_timeout(stage)
+            return fallback
+
+        started = time.monotonic()
+        if isolate and ISOLATE_STAGES:
+            try:
+                return run_isolated(function, args, budget)
+            except StageTimeout:
+                self.record_timeout(stage)
+                return fallback
+
+        result = function(*args)
+        if time.monotonic() - started > budget:
+            self.record_timeout(stage)
+        return result
@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Model instance owned by each worker process
+_worker_model = None
+
+# Barrier shared by all workers of a pool, used by warm_up
+_startup_barrier = None
+
+
+def available_cores():
+    """
+    CPU cores this process may run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_core_slices(num_workers, threads_per_worker):
+    """
+    Splits the available cores into one disjoint slice per worker.
+    """
+    cores = available_cores()
+    if num_workers * threads_per_worker > len(cores):
+        raise ValueError(
+            f"{num_workers} workers x {threads_per_worker} threads needs more than {len(cores)} cores"
+        )
+
+    return [
+        cores[index * threads_per_worker:(index + 1) * threads_per_worker]
+        for index in range(num_workers)
+    ]
+
+
+def _init_worker(core_slices, startup_barrier, threads_per_worker, model_name):
+    """
+    Pins the worker to its core slice, sizes torch's thread pools to
+    match, then loads the model once for the life of the process.
+    """
+    global _worker_model, _startup_barrier
+
+    _startup_barrier = startup_barrier
+
+    cores = core_slices.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    import torch
+    torch.set_num_threads(threads_per_worker)
+    torch.set_num_interop_threads(1)
+
+    from transformers import pipeline
+    _worker_model = pipeline("summarization", model=model_name)
+
+
+def _summarize(text, max_length, min_length, generation_kwargs):
+    # Generation time is measured here so queue wait is not counted
+    started = time.monotonic()
+    summary = _worker_model(
+        text,
+        max_length=max_length,
+        min_length=min_length,
+        truncation=True,
+        **generation_kwargs
+    )[0]['summary_text']
+    return summary, time.monotonic() - started
+
+
+def _ready():
+    # Holding every worker here until all have loaded keeps one fast
+    # worker from answering every warm-up task on its own
+    _startup_barrier.wait()
+    return os.getpid()
+
+
+class ShardedSummarizer:
+    """
+    Pool of model worker processes, each pinned to its own slice of cores.
+    Section summaries are independent, so the sections of one document,
+    or of many documents, are spread across the pool.
+    """
+
+    def __init__(self, num_workers, threads_per_worker, model_name):
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+
+        # Forking a process that already runs torch threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        core_slices = context.Queue()
+        for cores in plan_core_slices(num_workers, threads_per_worker):
+            core_slices.put(cores)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(core_slices, context.Barrier(num_workers), threads_per_worker, model_name)
+        )
+
+    def warm_up(self):
+        """
+        Starts every worker and waits until each has loaded its model.
+        """
+        futures = [self._executor.submit(_ready) for _ in range(self.num_workers)]
+        return [future.result() for future in futures]
+
+    def submit_sections(self, section_requests):
+        """
+        Queues every section and returns {section_key: future}.
+        Each future resolves to (summary, generation_seconds).
+        """
+        return {
+            key: self._executor.submit(_summarize, *request)
+            for key, request in section_requests.items()
+        }
+
+    def summarize_sections(self, section_requests):
+        """
+        Summaries for every section of one document, computed in parallel.
+        section_requests maps a section key to
+        (text, max_length, min_length, generation_kwargs).
+        """
+        futures = self.submit_sections(section_requests)
+        return {key: future.result()[0] for key, future in futures.items()}
+
+    def summarize_documents(self, documents):
+        """
+        Summaries for many documents, each given as its section_requests.
+        All sections are queued up front to keep every worker busy.
+        """
+        pending = [self.submit_sections(section_requests) for section_requests in documents]
+        return [{key: future.result()[0] for key, future in futures.items()} for futures in pending]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
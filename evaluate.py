@@ -1,4 +1,5 @@
 from rouge_score import rouge_scorer
+from engine import summarizer
 
 def calculate_metrics(reference_summary, generated_summary):
     scorer = rouge_scorer.RougeScorer(['rouge1', 'rougeL'], use_stemmer=True)
@@ -9,6 +10,27 @@ def calculate_metrics(reference_summary, generated_summary):
         "ROUGE-L": scores['rougeL'].fmeasure
     }
 
+def compare_engines(raw_document_text, reference_summaries):
+    """
+    Scores every summary engine against reference summaries.
+    reference_summaries maps result keys (e.g. "exec_summary", "decision")
+    to reference text.
+    Overload shedding is bypassed; raises if an engine could not produce
+    its own summaries, so engines are never compared with a fallback.
+    """
+    report = {}
+    
+    for engine in summarizer.SUMMARY_ENGINES:
+        result = summarizer.get_summarized_data(raw_document_text, engine=engine, shed_load=False)
+        if result["summary_engine"] != engine:
+            raise RuntimeError(f"{engine} summaries unavailable, got {result['summary_engine']} instead")
+        report[engine] = {
+            section: calculate_metrics(reference, result[section])
+            for section, reference in reference_summaries.items()
+        }
+    
+    return report
+
 # Example Usage:
 # ref = "The court directed the respondents to release arrear pension and gratuity to Smt. Rashmi Rekha Saikia."
 # gen = "Petitioner prays for release of arrear pension and gratuity..."
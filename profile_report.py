@@ -0,0 +1,85 @@
+import argparse
+import json
+import time
+from collections import defaultdict
+
+from engine import processor, summarizer
+from evaluate import calculate_metrics
+
+
+def load_reference_set(path):
+    """
+    Reads a JSON-lines reference set. Each line holds the document as
+    "pdf" (a path) or "text", and "references" mapping section keys
+    (e.g. "exec_summary", "decision") to reference summaries.
+    """
+    documents = []
+
+    with open(path, encoding="utf-8") as reference_file:
+        for line in reference_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "pdf" in entry:
+                with open(entry["pdf"], "rb") as pdf_file:
+                    raw_text = processor.get_text(pdf_file)
+            else:
+                raw_text = entry["text"]
+            documents.append((summarizer.clean_legal_text(raw_text), entry["references"]))
+
+    return documents
+
+
+def profile_report(documents, profiles):
+    """
+    Mean latency and ROUGE per profile and section.
+    Returns {profile: {section: {"latency": s, "ROUGE-1": f, "ROUGE-L": f}}}.
+    """
+    report = {}
+
+    for profile in profiles:
+        samples = defaultdict(lambda: defaultdict(list))
+        section_profiles = summarizer.resolve_section_profiles(profile)
+
+        for cleaned_text, references in documents:
+            section_spans = summarizer.get_section_spans(cleaned_text)
+            section_requests = summarizer.build_section_requests(cleaned_text, section_spans, section_profiles)
+
+            for section, reference in references.items():
+                started = time.perf_counter()
+                summary = summarizer.summarize_section(*section_requests[section])
+                samples[section]["latency"].append(time.perf_counter() - started)
+
+                for metric, score in calculate_metrics(reference, summary).items():
+                    samples[section][metric].append(score)
+
+        report[profile] = {
+            section: {metric: sum(values) / len(values) for metric, values in metrics.items()}
+            for section, metrics in samples.items()
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency and ROUGE per decoding profile and section.")
+    parser.add_argument("reference_set", help="JSON-lines file of documents and reference summaries")
+    parser.add_argument("--profiles", nargs="*", default=list(summarizer.DECODING_PROFILES), help="Profiles to compare")
+    args = parser.parse_args()
+
+    documents = load_reference_set(args.reference_set)
+
+    # Load the model up front so the first profile is not charged for it
+    summarizer.load_summarization_model()
+
+    results = profile_report(documents, args.profiles)
+
+    print(f"{'profile':<10} {'section':<14} {'latency (s)':>12} {'ROUGE-1':>8} {'ROUGE-L':>8}")
+    for profile, sections in results.items():
+        for section, metrics in sections.items():
+            print(
+                f"{profile:<10} {section:<14} {metrics['latency']:>12.2f} "
+                f"{metrics['ROUGE-1']:>8.3f} {metrics['ROUGE-L']:>8.3f}"
+            )
+        total_latency = sum(metrics["latency"] for metrics in sections.values())
+        print(f"{profile:<10} {'(total)':<14} {total_latency:>12.2f}\n")